@@ -0,0 +1,285 @@
+"""Serve an agent to games in other processes, over ``multiprocessing.connection``.
+
+Run a server for an agent, then play games with it from any number of processes:
+
+    python agent_server.py TailChaser --address /tmp/tail-chaser.sock
+    ./run agent TailChaser --remote /tmp/tail-chaser.sock
+
+The agent then can't crash the game (its errors are sent back instead), and doesn't compete with
+rendering and hooks for the GIL. Addresses are Unix socket paths, or HOST:PORT for TCP.
+
+Protocol: on connecting, the server sends the agent's class name. The client then sends a state
+(``Game.to_bytes``) and waits for the reply: a status byte (``OK`` or ``ERROR``), followed by
+either one byte per action (``Direction.value``, or 0 for None) or an error message.
+
+Requests are answered in batches: after the first request arrives, the server waits up to
+``batch_window`` seconds for requests from the other connections (so a lone client never waits).
+If the agent has a ``get_actions(states)`` method (returning one agent result per state), it gets
+the whole batch at once, and is shared by every connection, so it must not keep per-game state.
+Otherwise, each connection gets its own instance of the agent, whose ``get_action`` is called for
+each request.
+"""
+import argparse
+import logging
+import queue
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Iterable, Mapping, Protocol
+
+import agents
+import controllers
+from agents import BaseAgent
+from game import Game
+from utils import Direction
+
+OK = 0
+ERROR = 1
+# the action code of None (Direction values start at 1)
+NO_ACTION = 0
+DIRECTIONS = {direction.value: direction for direction in Direction}
+
+
+def parse_address(address: str) -> str | tuple[str, int]:
+    """Return a Unix socket path as is, and HOST:PORT as a (host, port) tuple."""
+    host, _, port = address.rpartition(":")
+    return (host, int(port)) if host and port.isdigit() else address
+
+
+def actions_reply(game: Game, result: Iterable[Direction | None] | Direction | None) -> bytes:
+    """Return the reply for an agent's result for ``game``."""
+    try:
+        actions = controllers.as_action_list(result, game)
+    except Exception as ex:
+        return error_reply(ex)
+    return bytes((OK, *(NO_ACTION if action is None else action.value for action in actions)))
+
+
+def error_reply(ex: Exception) -> bytes:
+    return bytes((ERROR,)) + f"{type(ex).__name__}: {ex}".encode()
+
+
+def decode_request(request: bytes) -> Game | bytes:
+    """Return the state sent in ``request``, or the error reply if it can't be decoded."""
+    try:
+        return Game.from_bytes(request)
+    except Exception as ex:
+        logging.exception("Failed to decode a request")
+        return error_reply(ex)
+
+
+def decode_reply(reply: bytes) -> list[Direction | None]:
+    if reply[0] == ERROR:
+        raise Exception(f"The agent server failed: {reply[1:].decode()}")
+    return [DIRECTIONS.get(code) for code in reply[1:]]
+
+
+class BatchingAgent(Protocol):
+    def get_actions(
+        self, states: list[Game]
+    ) -> Iterable[Iterable[Direction | None] | Direction | None]:
+        ...
+
+
+class AgentServer:
+    """Answers requests for actions from every connection to ``address`` (see module docs)."""
+
+    def __init__(
+        self,
+        agent_class: type[BaseAgent],
+        agent_args: Iterable[Any] = (),
+        agent_kwargs: Mapping[str, Any] | None = None,
+        address: str | tuple[str, int] | None = None,
+        authkey: bytes | None = None,
+        max_batch: int = 64,
+        batch_window: float = 0.001,
+    ) -> None:
+        self.agent_class = agent_class
+        self.agent_args = tuple(agent_args)
+        self.agent_kwargs = dict(agent_kwargs or {})
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.listener = Listener(address, authkey=authkey)
+        self.batching = hasattr(agent_class, "get_actions")
+        # the shared instance of a batching agent, or an instance per connection
+        self.shared_agent: BatchingAgent | None = self.new_agent() if self.batching else None
+        self.connections: set[Connection] = set()
+        self.agents: dict[Connection, Any] = {}
+        self.requests: queue.Queue[tuple[Connection, bytes]] = queue.Queue()
+        self.batches = 0
+        self.requests_answered = 0
+
+    @property
+    def address(self) -> str | tuple[str, int]:
+        return self.listener.address
+
+    def new_agent(self) -> Any:
+        return self.agent_class(*self.agent_args, **self.agent_kwargs)
+
+    def serve_forever(self) -> None:
+        """Accept connections and answer their requests (until interrupted)."""
+        threading.Thread(target=self._answer_requests, name="agent-server", daemon=True).start()
+        while True:
+            connection = self.listener.accept()
+            self.connections.add(connection)
+            if not self.batching:
+                self.agents[connection] = self.new_agent()
+            connection.send_bytes(self.agent_class.__name__.encode())
+            threading.Thread(target=self._receive_requests, args=(connection,), daemon=True).start()
+
+    def _receive_requests(self, connection: Connection) -> None:
+        try:
+            while True:
+                self.requests.put((connection, connection.recv_bytes()))
+        except (EOFError, OSError):
+            self.connections.discard(connection)
+            self.agents.pop(connection, None)
+            connection.close()
+
+    def next_batch(self) -> list[tuple[Connection, bytes]]:
+        """Wait for a request, then return it with any others arriving within the batch window.
+
+        The window is cut short once every connection has a request in the batch.
+        """
+        batch = [self.requests.get()]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < min(self.max_batch, len(self.connections)):
+            try:
+                batch.append(self.requests.get(timeout=max(0.0, deadline - time.perf_counter())))
+            except queue.Empty:
+                break
+        return batch
+
+    def answer(self, batch: list[tuple[Connection, bytes]]) -> list[bytes]:
+        """Return the replies to a batch of requests."""
+        states = [decode_request(request) for _, request in batch]
+        games = [state for state in states if isinstance(state, Game)]
+        if self.shared_agent is not None:
+            replies = iter(self.answer_batch(self.shared_agent, games))
+        else:
+            replies = iter(
+                self.answer_one(connection, state)
+                for (connection, _), state in zip(batch, states)
+                if isinstance(state, Game)
+            )
+        # requests that couldn't be decoded already have their (error) reply
+        return [next(replies) if isinstance(state, Game) else state for state in states]
+
+    def answer_batch(self, agent: BatchingAgent, games: list[Game]) -> list[bytes]:
+        if not games:
+            return []
+        try:
+            results = list(agent.get_actions(games))
+            if len(results) != len(games):
+                raise Exception(
+                    f"get_actions returned {len(results)} results for {len(games)} states"
+                )
+        except Exception as ex:
+            logging.exception("The agent failed to choose actions")
+            return [error_reply(ex)] * len(games)
+        return [actions_reply(game, result) for game, result in zip(games, results)]
+
+    def answer_one(self, connection: Connection, game: Game) -> bytes:
+        try:
+            result = self.agents[connection].get_action(game)
+        except Exception as ex:
+            logging.exception("The agent failed to choose an action")
+            return error_reply(ex)
+        return actions_reply(game, result)
+
+    def _answer_requests(self) -> None:
+        while True:
+            batch = self.next_batch()
+            self.batches += 1
+            self.requests_answered += len(batch)
+            try:
+                replies = self.answer(batch)
+            except Exception as ex:
+                # keep serving, and don't leave the clients waiting for a reply
+                logging.exception("Failed to answer a batch of requests")
+                replies = [error_reply(ex)] * len(batch)
+            for (connection, _), reply in zip(batch, replies):
+                try:
+                    connection.send_bytes(reply)
+                except OSError:
+                    pass  # the client disconnected
+
+    def close(self) -> None:
+        self.listener.close()
+
+
+class AgentClient:
+    """Stands in for an agent, asking an ``AgentServer`` for each action.
+
+    If ``agent`` is given, it must be the name of the agent the server serves.
+    """
+
+    def __init__(
+        self, address: str | tuple[str, int], authkey: bytes | None = None, agent: str | None = None
+    ) -> None:
+        self.connection = Client(address, authkey=authkey)
+        self.agent = self.connection.recv_bytes().decode()
+        if agent is not None and agent != self.agent:
+            raise Exception(f"The agent server at {address} serves {self.agent}, not {agent}")
+
+    def get_action(self, state: Game) -> list[Direction | None]:
+        self.connection.send_bytes(state.to_bytes())
+        return decode_reply(self.connection.recv_bytes())
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class RemoteAgent(controllers.Agent):
+    """An Agent controller whose agent runs in an ``AgentServer`` (e.g., in another process)."""
+
+    def __init__(
+        self,
+        address: str | tuple[str, int],
+        authkey: bytes | None = None,
+        agent: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            agent_class=AgentClient,
+            agent_kwargs={"address": address, "authkey": authkey, "agent": agent},
+            **kwargs,
+        )
+
+
+def main() -> None:
+    agent_choices = sorted(agent.__name__ for agent in BaseAgent.__subclasses__())
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("agent", choices=agent_choices)
+    argparser.add_argument(
+        "--address",
+        required=True,
+        help="A Unix socket path, or HOST:PORT to listen on TCP (local use only: no encryption).",
+    )
+    argparser.add_argument("--max-batch", type=int, default=64)
+    argparser.add_argument(
+        "--batch-window",
+        type=float,
+        default=0.001,
+        help="Seconds to wait for more requests to batch with the first.",
+    )
+    args = argparser.parse_args()
+    agent_class = getattr(agents, args.agent)
+    server = AgentServer(
+        agent_class,
+        agent_kwargs={"dump": False} if agent_class is agents.QQ else None,
+        address=parse_address(args.address),
+        max_batch=args.max_batch,
+        batch_window=args.batch_window,
+    )
+    print(f"Serving {args.agent} at {server.address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,27 @@
 import abc
 import logging
+import math
+import multiprocessing
 import random
+import signal
+import time
+from collections import Counter
 from dataclasses import dataclass, field, replace
+from functools import cache
+from multiprocessing.pool import AsyncResult, Pool
 from pprint import pprint
 from statistics import mean
-from typing import Any, Callable, Iterable, NamedTuple
+from typing import Any, Callable, Iterable, NamedTuple, Sequence
 
 from game import Game
+from tracing import traced
 from transformers import obstacle_food_direction_state
 from utils import (
+    Coordinate,
     Direction,
     PriorityQueue,
     arg_max,
+    coordinate_table,
     get_timestamped_file_path,
     manhattan_distance,
     reciprocal,
@@ -20,7 +30,7 @@ from utils import (
 
 class BaseAgent(abc.ABC):
     @abc.abstractmethod
-    def get_action(self, state: Game) -> Iterable[Direction] | Direction | None:
+    def get_action(self, state: Game) -> Iterable[Direction | None] | Direction | None:
         ...
 
 
@@ -100,6 +110,116 @@ class GentleBrute(BaseAgent):
             return Direction.UP  # continue UP in even indexed columns
 
 
+@dataclass(frozen=True, kw_only=True, slots=True)
+class HamiltonianCycle:
+    """A closed path visiting every cell of a grid once (see ``hamiltonian_cycle``)."""
+
+    cells: tuple[Coordinate, ...]
+    """the cells in cycle order"""
+    index: dict[Coordinate, int]
+    """each cell's position in ``cells``"""
+    moves: dict[Coordinate, tuple[tuple[Direction, int], ...]]
+    """the direction to, and index of, each of a cell's neighbors on the grid"""
+
+
+@cache
+def hamiltonian_cycle(grid_width: int, grid_height: int) -> HamiltonianCycle:
+    """Return a Hamiltonian cycle of the grid, which the default snake starts on.
+
+    With an even width, it's GentleBrute's sweep: down the first column, then up and down the
+    other columns (below the top row), and back along the top row. Otherwise, the height must be
+    even, and the cycle snakes right and left along the rows (right of the first column) instead.
+    Grids with both sides odd (or either side 1) are unsupported.
+    """
+    table = coordinate_table(grid_width, grid_height)
+    cells = [table.at(0, y) for y in range(grid_height)]
+    if grid_width % 2 == 0 and grid_height > 1:
+        for x in range(1, grid_width):
+            rows = range(1, grid_height)
+            cells.extend(table.at(x, y) for y in (reversed(rows) if x % 2 else rows))
+        cells.extend(table.at(x, 0) for x in range(grid_width - 1, 0, -1))
+    elif grid_height % 2 == 0 and grid_width > 1:
+        for y in range(grid_height - 1, -1, -1):
+            columns = range(1, grid_width)
+            odd = (grid_height - 1 - y) % 2
+            cells.extend(table.at(x, y) for x in (reversed(columns) if odd else columns))
+    else:
+        raise Exception(f"No Hamiltonian cycle on a {grid_width}x{grid_height} grid")
+
+    index = {cell: i for i, cell in enumerate(cells)}
+    moves = {
+        cell: tuple(
+            (direction, index[neighbor])
+            for direction, neighbor in table.neighbors[cell].items()
+            if neighbor in index
+        )
+        for cell in cells
+    }
+    return HamiltonianCycle(cells=tuple(cells), index=index, moves=moves)
+
+
+class Hamiltonian(BaseAgent):
+    """Follows a Hamiltonian cycle, taking shortcuts toward food while the snake is short.
+
+    Its body then always lies in cycle order from tail to head, so any cell ahead of the head
+    (along the cycle) and before the tail is free. A shortcut skips ahead to the neighbor closest
+    to the nearest food ahead, without passing it. The cells it skips stay empty behind the head
+    until the tail gets there, and each food eaten before then leaves one less free cell ahead
+    (the tail stays put while the snake grows), so a shortcut must leave more than ``margin``
+    cells ahead, plus one for each food the snake may eat meanwhile (see ``get_action``). Once
+    the snake fills half the grid, it only follows the cycle until the grid is full. Growth can
+    still (rarely) outrun the estimate, in which case the snake turns into any free cell.
+
+    Cycles are computed once per grid size, after which each action takes constant time. The
+    snake must start on the cycle, as the default snake does (see ``hamiltonian_cycle``).
+    """
+
+    def __init__(self, margin: int = 4) -> None:
+        self.margin = margin
+
+    def get_action(self, state: Game) -> Direction:
+        cycle = hamiltonian_cycle(state.grid_width, state.grid_height)
+        size = len(cycle.cells)
+        snake = state.snake
+        head = cycle.index[snake.head]
+        eating = snake.head in state.food
+        # the tail after this move, which stays put if the snake eats the food under its head
+        tail = cycle.index[snake.segments[-1 if eating else -2]]
+        # the free cells ahead of the head (along the cycle), before the tail
+        gap = (tail - head) % size - 1
+        # how far ahead (along the cycle) the head may move
+        reach = min(gap, 1)
+        if len(snake.segments) < size // 2:
+            food = [distance for f in state.food if (distance := (cycle.index[f] - head) % size)]
+            # the food the snake may eat before its tail reaches the cells a shortcut skips: the
+            # food on the grid, and about as much again each time the head covers the free cells
+            # in the (body length) moves the tail needs to get there
+            free = size - len(snake.segments)
+            growth = len(state.food) * (1 + math.ceil(len(snake.segments) / free))
+            shortcut = gap - self.margin - growth - 1
+            reach = max(reach, min(shortcut, min(food, default=1)))
+        valid_actions = snake.valid_actions
+        best_action, best_distance = None, 0
+        for action, neighbor in cycle.moves[snake.head]:
+            distance = (neighbor - head) % size
+            if best_distance < distance <= reach and action in valid_actions:
+                best_action, best_distance = action, distance
+        if best_action is None:
+            # (only if the snake didn't start on the cycle, or ran out of room ahead)
+            return self.off_cycle_action(state, cycle, eating)
+        return best_action
+
+    @staticmethod
+    def off_cycle_action(state: Game, cycle: HamiltonianCycle, eating: bool) -> Direction:
+        """Return a move into a free cell, if there is one (or else keep going)."""
+        snake = state.snake
+        body = set(snake.segments if eating else snake.segments[:-1])
+        for action, neighbor in cycle.moves[snake.head]:
+            if action in snake.valid_actions and cycle.cells[neighbor] not in body:
+                return action
+        return snake.direction
+
+
 class Random(BaseAgent):
     def get_action(self, game: Game) -> Direction:
         return Direction.random()
@@ -129,6 +249,31 @@ def feeder_goal(state: Game) -> bool:
     return len(state.food_at(state.snake.head)) > 0
 
 
+@dataclass
+class SearchStats:
+    """The largest A* frontier and closed set sizes, of the latest search and of all searches.
+
+    Frontier nodes hold whole ``Game`` states (and their action paths), so these sizes dominate
+    the memory used by searching (see memory.py).
+    """
+
+    searches: int = 0
+    latest_frontier: int = 0
+    latest_closed: int = 0
+    peak_frontier: int = 0
+    peak_closed: int = 0
+
+    def record(self, peak_frontier: int, closed: int) -> None:
+        self.searches += 1
+        self.latest_frontier, self.latest_closed = peak_frontier, closed
+        self.peak_frontier = max(self.peak_frontier, peak_frontier)
+        self.peak_closed = max(self.peak_closed, closed)
+
+
+SEARCH_STATS = SearchStats()
+
+
+@traced("a_star2", "agent")
 def a_star2(
     state: Game,
     heuristic: Callable[[Game], float] = min_man_heuristic,
@@ -152,6 +297,7 @@ def a_star2(
             item=successor_node, priority=successor_node.cost + heuristic(successor_node.state)
         )
 
+    peak_frontier = len(frontier.heap)
     while frontier.has_items:
         current_node: PathNode = frontier.pop()
         logging.debug(
@@ -161,6 +307,7 @@ def a_star2(
         )
         if goal(current_node.state):
             logging.debug(f"A* GOAL {goal=} FOUND: {current_node=}")
+            SEARCH_STATS.record(peak_frontier, len(closed))
             return current_node.actions
         closed.append(current_node.state.snake.head)
         successor_nodes = [
@@ -191,10 +338,13 @@ def a_star2(
                     f"\tcost={successor_node.cost} actions={successor_node.actions}"
                 )
                 frontier.update(item=successor_node, priority=successor_node.cost + heuristic_value)
+        peak_frontier = max(peak_frontier, len(frontier.heap))
 
+    SEARCH_STATS.record(peak_frontier, len(closed))
     return None  # no path to goal state
 
 
+@traced("a_star", "agent")
 def a_star(
     state: Game,
     heuristic: Callable[[Game], float] = min_man_heuristic,
@@ -218,6 +368,7 @@ def a_star(
             item=successor_node, priority=successor_node.cost + heuristic(successor_node.state)
         )
 
+    peak_frontier = len(frontier.heap)
     while frontier.has_items:
         current_node: PathNode = frontier.pop()
         logging.debug(
@@ -227,6 +378,7 @@ def a_star(
         )
         if goal(current_node.state):
             logging.debug(f"A* GOAL {goal=} FOUND: {current_node=}")
+            SEARCH_STATS.record(peak_frontier, len(closed))
             return current_node.actions
         closed.append(current_node.state)
         successor_nodes = [
@@ -257,7 +409,9 @@ def a_star(
                     f"\tcost={successor_node.cost} actions={successor_node.actions}"
                 )
                 frontier.update(item=successor_node, priority=successor_node.cost + heuristic_value)
+        peak_frontier = max(peak_frontier, len(frontier.heap))
 
+    SEARCH_STATS.record(peak_frontier, len(closed))
     return None  # no path to goal state
 
 
@@ -276,6 +430,45 @@ class PathNode(NamedTuple):
 QValues = dict[tuple[Game | tuple, Direction], float]  # type variable
 
 
+@dataclass
+class QSummary:
+    """Counts (and the sum) of Q values, maintained incrementally as Q values change.
+
+    Note that -inf is counted both as ``negative`` and ``negative_infinite``, and ``total_sum``
+    excludes nan and -inf values.
+    """
+
+    total: int = 0
+    positive: int = 0
+    zero: int = 0
+    negative: int = 0
+    nan: int = 0
+    negative_infinite: int = 0
+    total_sum: float = 0.0
+
+    def _count(self, value: float, sign: int) -> None:
+        if value > 0:
+            self.positive += sign
+        elif value == 0:
+            self.zero += sign
+        elif value < 0:
+            self.negative += sign
+        if math.isnan(value):
+            self.nan += sign
+        elif value == float("-inf"):
+            self.negative_infinite += sign
+        else:
+            self.total_sum += sign * value
+
+    def update(self, old_value: float | None, new_value: float) -> None:
+        """Account for a Q value changing from ``old_value`` (None if new) to ``new_value``."""
+        if old_value is None:
+            self.total += 1
+        else:
+            self._count(old_value, -1)
+        self._count(new_value, 1)
+
+
 @dataclass
 class QQ(BaseAgent):
     """A Q-learning agent.
@@ -315,6 +508,9 @@ class QQ(BaseAgent):
     living_reward: float = -0.01
 
     def __post_init__(self):
+        self.Q_summary = QSummary()
+        for value in self.Q.values():
+            self.Q_summary.update(None, value)
         if self.dump:
             self.dump_file = get_timestamped_file_path("debug-logs", suffix=".q").open("w")
 
@@ -368,9 +564,181 @@ class QQ(BaseAgent):
         weighted_difference = self.learning_rate * self.difference(
             state, action, next_state, reward
         )
-        self.Q[(self.state_transformer(state), action)] = (
-            self.get_Q_value(state, action) + weighted_difference
-        )
+        key = (self.state_transformer(state), action)
+        old_value = self.Q.get(key)
+        self.Q[key] = self.get_Q_value(state, action) + weighted_difference
+        self.Q_summary.update(old_value, self.Q[key])
         if random.random() < 0.01:
             # we just occassionally log Q values 1% of the time so the log file doesn't get too big
             logging.debug(f"Q update: {self.Q.values()}")
+
+
+def reachable_cells(state: Game) -> set[Coordinate]:
+    """Return the cells the snake's head can reach (including the head itself).
+
+    The tail's cell counts as free, because the tail moves out of the way as the snake moves.
+    """
+    adjacent = coordinate_table(state.grid_width, state.grid_height).adjacent
+    blocked = set(state.snake.segments[:-1])
+    head = state.snake.head
+    reachable = {head}
+    pending = [head]
+    while pending:
+        for neighbor in adjacent[pending.pop()]:
+            if neighbor not in reachable and neighbor not in blocked:
+                reachable.add(neighbor)
+                pending.append(neighbor)
+    return reachable
+
+
+def plan_value(state: Game, plan: Sequence[Direction | None]) -> tuple[float, int] | None:
+    """Return the value of following ``plan`` from ``state``, or None if it isn't safe.
+
+    A plan is safe if following it doesn't end the game, and afterwards the snake can still reach
+    its tail (or at least as many cells as it is long). Safe plans are valued by the food eaten
+    per move, then by the number of cells left to move in.
+    """
+    if not plan:
+        return None
+    final = state
+    for action in plan:
+        if action is not None and action not in final.snake.valid_actions:
+            return None
+        final = final.update(action)
+        if final.game_over:
+            return None
+    reachable = reachable_cells(final)
+    if final.snake.tail not in reachable and len(reachable) < len(final.snake.segments):
+        return None
+    # (food under the head is eaten on the next update)
+    eaten = final.score - state.score + len(final.food_at(final.snake.head))
+    return eaten / len(plan), len(reachable)
+
+
+def room(state: Game, action: Direction) -> int:
+    """Return the number of cells reachable after taking ``action`` (-1 if it ends the game)."""
+    successor = state.update(action)
+    return -1 if successor.game_over else len(reachable_cells(successor))
+
+
+# the agent played by a Portfolio worker process
+_MEMBER: BaseAgent | None = None
+
+
+def _start_member(name: str) -> None:
+    global _MEMBER
+    # pygame.init() makes SIGTERM post a quit event instead, which would keep Pool.terminate()
+    # from stopping a forked worker
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _MEMBER = globals()[name]()
+
+
+def _member_plan(state: bytes) -> list[Direction | None] | None:
+    assert _MEMBER is not None
+    match _MEMBER.get_action(Game.from_bytes(state)):
+        case Direction() as action:
+            return [action]
+        case None:
+            return None
+        case actions:
+            return list(actions) or None
+
+
+class Portfolio(BaseAgent):
+    """Follows the best plan of several agents ("members") that plan concurrently.
+
+    Each member plans in its own worker process, so they use idle cores, and a slow member can't
+    hold up the game: ``get_action`` waits at most ``deadline`` seconds for the members' plans for
+    the current state. A member still planning for an earlier state is skipped until it's done.
+
+    The ready plans are compared with ``plan_value``, along with the move GentleBrute would make
+    (or, once the snake has left GentleBrute's sweep, the move leaving it the most room), which is
+    followed if no plan is safe. ``choices`` counts whose plan was followed.
+    """
+
+    FALLBACK = "fallback"
+
+    def __init__(
+        self, members: Iterable[str] = ("Hungry", "TailChaser"), deadline: float = 0.05
+    ) -> None:
+        self.members = tuple(members)
+        agent_names = {agent.__name__ for agent in BaseAgent.__subclasses__()} - {"Portfolio"}
+        for member in self.members:
+            if member not in agent_names:
+                raise Exception(f"Invalid portfolio {member=} (expected one of {agent_names})")
+        self.deadline = deadline
+        self.fallback_agent = GentleBrute()
+        self.pools: dict[str, Pool] = {}
+        # the state each member is (or was last) planning for, and its plan
+        self.pending: dict[str, tuple[Game, AsyncResult[list[Direction | None] | None]]] = {}
+        self.choices: Counter[str] = Counter()
+
+    def fallback(self, state: Game) -> list[Direction | None]:
+        action = self.fallback_agent.get_action(state)
+        if plan_value(state, [action]) is None:
+            action = max(state.snake.direction.next(), key=lambda action: room(state, action))
+        return [action]
+
+    def get_action(self, state: Game) -> Iterable[Direction | None] | Direction | None:
+        deadline = time.perf_counter() + self.deadline
+        if not self.pools:
+            self.start_pools()
+        planning = self.request_plans(state)
+        plans = {self.FALLBACK: self.fallback(state), **self.ready_plans(planning, deadline)}
+        best = self.best_plan(state, plans)
+        self.choices[best] += 1
+        return plans[best]
+
+    def start_pools(self) -> None:
+        """Start a worker process for each member."""
+        for member in self.members:
+            self.pools[member] = multiprocessing.Pool(
+                1, initializer=_start_member, initargs=(member,)
+            )
+
+    def request_plans(self, state: Game) -> dict[str, AsyncResult[list[Direction | None] | None]]:
+        """Ask every idle member to plan for ``state``, and return those planning for it."""
+        state_bytes = state.to_bytes()
+        for member, pool in self.pools.items():
+            if member not in self.pending or self.pending[member][1].ready():
+                self.pending[member] = (state, pool.apply_async(_member_plan, (state_bytes,)))
+        return {
+            member: result
+            for member, (planned_for, result) in self.pending.items()
+            if planned_for is state
+        }
+
+    def ready_plans(
+        self, planning: dict[str, AsyncResult[list[Direction | None] | None]], deadline: float
+    ) -> dict[str, list[Direction | None]]:
+        """Wait for the members' plans until ``deadline``, and return the ready (nonempty) ones."""
+        for result in planning.values():
+            result.wait(max(0.0, deadline - time.perf_counter()))
+        plans = {}
+        for member, result in planning.items():
+            if not result.ready():
+                continue
+            try:
+                plan = result.get()
+            except Exception as ex:
+                logging.info(f"Portfolio member {member} failed: {ex}")
+            else:
+                if plan:
+                    plans[member] = plan
+        return plans
+
+    def best_plan(self, state: Game, plans: dict[str, list[Direction | None]]) -> str:
+        """Return whose plan has the highest ``plan_value`` (the fallback's if none are safe)."""
+        values = {
+            member: value
+            for member, plan in plans.items()
+            if (value := plan_value(state, plan)) is not None
+        }
+        return max(values, key=values.__getitem__) if values else self.FALLBACK
+
+    def close(self) -> None:
+        """Stop the members' worker processes (without waiting for them to finish planning)."""
+        for pool in self.pools.values():
+            pool.terminate()
+        self.pools.clear()
+        self.pending.clear()
@@ -0,0 +1,236 @@
+"""Micro-benchmarks of the game engine, agents and serializers, with baseline tracking.
+
+Every benchmark uses a fixed random seed and board size, so results are comparable between runs
+(on the same machine). Run all of them (or only the named ones) with:
+
+    python benchmarks.py [NAME ...]
+
+Save the results as the baseline with ``--save``. Later runs are compared against the baseline,
+and exit with status 1 if any benchmark is more than ``--threshold`` (e.g., 0.25 = 25%) slower.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from itertools import cycle
+from pathlib import Path
+from typing import Any, Callable
+
+from agents import QQ, TailChaser, a_star, a_star2, feeder_goal, tail_chaser_goal
+from game import AsciiRenderer, Game
+from snake import Snake
+from transformers import obstacle_food_direction_state
+from utils import Coordinate, Direction, coordinate_table
+
+DEFAULT_BASELINE_PATH = Path(__file__).parent / "benchmarks-baseline.json"
+
+# a function that sets up a benchmark and returns the (argument-less) function to time
+Setup = Callable[[], Callable[[], Any]]
+BENCHMARKS: dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def serpentine_game(grid_width: int, grid_height: int, length: int, food: int = 2) -> Game:
+    """Return a game whose snake winds back and forth across the board from the top left.
+
+    The snake's head is at the end of its ``length``-cell path, moving away from the body.
+    """
+    path = [
+        Coordinate(x if y % 2 == 0 else grid_width - 1 - x, y)
+        for y in range(grid_height)
+        for x in range(grid_width)
+    ][:length]
+    segments = tuple(reversed(path))
+    return Game(
+        grid_width=grid_width,
+        grid_height=grid_height,
+        snake=Snake(segments=segments),
+        food=Coordinate.random(grid_width, grid_height, n=food, exclude=frozenset(segments)),
+    )
+
+
+def random_walk(game: Game, ticks: int) -> list[Game]:
+    """Return the states visited by moving randomly (but safely, when possible)."""
+    states = [game]
+    for _ in range(ticks):
+        safe = [s for s in states[-1].successors if not s.game_over]
+        if not safe:
+            break
+        states.append(random.choice(safe))
+    return states
+
+
+def safe_direction(game: Game) -> Direction:
+    return next(s.snake.direction for s in game.successors if not s.game_over)
+
+
+@benchmark("Game.update")
+def game_update() -> Callable[[], Any]:
+    game = serpentine_game(72, 48, length=200)
+    direction = safe_direction(game)
+    return lambda: game.update(direction)
+
+
+@benchmark("Game.successors")
+def game_successors() -> Callable[[], Any]:
+    game = serpentine_game(72, 48, length=200)
+    return lambda: game.successors
+
+
+@benchmark("Snake.move")
+def snake_move() -> Callable[[], Any]:
+    game = serpentine_game(72, 48, length=200)
+    direction = safe_direction(game)
+    neighbors = coordinate_table(72, 48).neighbors
+    return lambda: game.snake.move(direction, grow=False, neighbors=neighbors)
+
+
+@benchmark("Coordinate.random (full board)")
+def coordinate_random_full_board() -> Callable[[], Any]:
+    game = serpentine_game(20, 20, length=390)
+    exclude = frozenset(game.snake.segments)
+    return lambda: Coordinate.random(20, 20, n=1, exclude=exclude)
+
+
+@benchmark("a_star")
+def a_star_feeder() -> Callable[[], Any]:
+    game = serpentine_game(12, 8, length=10)
+    return lambda: a_star(game, goal=feeder_goal)
+
+
+@benchmark("a_star2")
+def a_star2_feeder() -> Callable[[], Any]:
+    game = serpentine_game(12, 8, length=10)
+    return lambda: a_star2(game, goal=feeder_goal)
+
+
+@benchmark("TailChaser.get_action")
+def tail_chaser() -> Callable[[], Any]:
+    game = serpentine_game(12, 8, length=10)
+    agent = TailChaser()
+    return lambda: agent.get_action(game)
+
+
+@benchmark("tail_chaser_goal")
+def tail_chaser_goal_benchmark() -> Callable[[], Any]:
+    game = serpentine_game(12, 8, length=10)
+    return lambda: tail_chaser_goal(game)
+
+
+@benchmark("obstacle_food_direction_state")
+def obstacle_food_direction() -> Callable[[], Any]:
+    game = serpentine_game(72, 48, length=200)
+    return lambda: obstacle_food_direction_state(game)
+
+
+@benchmark("QQ.get_action")
+def qq_get_action() -> Callable[[], Any]:
+    states = cycle(random_walk(serpentine_game(12, 8, length=10), ticks=1000))
+    agent = QQ(dump=False)
+    return lambda: agent.get_action(next(states))
+
+
+@benchmark("Game.to_json")
+def to_json() -> Callable[[], Any]:
+    game = serpentine_game(72, 48, length=200)
+    return game.to_json
+
+
+@benchmark("Game.to_yaml")
+def to_yaml() -> Callable[[], Any]:
+    game = serpentine_game(72, 48, length=200)
+    return game.to_yaml
+
+
+@benchmark("Game.to_ascii")
+def to_ascii() -> Callable[[], Any]:
+    # successive states, as when rendering every tick (see game.AsciiRenderer)
+    states = cycle(random_walk(serpentine_game(72, 48, length=200), ticks=1000))
+    renderer = AsciiRenderer()
+    return lambda: next(states).to_ascii(renderer)
+
+
+def run(name: str, repeat: int = 5) -> float:
+    """Return the best time (in seconds) per call of the named benchmark."""
+    random.seed(f"benchmark {name}")
+    function = BENCHMARKS[name]()
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    """Print each result next to its baseline, and return the names of the regressions."""
+    regressions = []
+    print(f"{'benchmark':<32} {'µs/call':>12} {'baseline':>12} {'change':>8}")
+    for name, seconds in results.items():
+        line = f"{name:<32} {seconds * 1e6:12.3f}"
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += f" {baseline[name] * 1e6:12.3f} {change:+8.1%}"
+            if change > threshold:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+    return regressions
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument(
+        "names", nargs="*", help=f"Benchmarks to run (default: all): {', '.join(BENCHMARKS)}"
+    )
+    argparser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    argparser.add_argument("--save", action="store_true", help="Save the results as the baseline.")
+    argparser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Fail if any benchmark is slower than its baseline by more than this fraction.",
+    )
+    argparser.add_argument(
+        "--repeat", type=int, default=5, help="Time each benchmark this many times (best is kept)."
+    )
+    args = argparser.parse_args()
+    if unknown := [name for name in args.names if name not in BENCHMARKS]:
+        argparser.error(f"Unknown benchmarks: {unknown}")
+
+    results = {}
+    for name in args.names or BENCHMARKS:
+        results[name] = run(name, repeat=args.repeat)
+        print(f"{name}: {results[name] * 1e6:.3f}µs", file=sys.stderr)
+
+    baseline: dict[str, float] = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.platform(),
+                    "results": {**baseline, **results},
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+    elif regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {regressions}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
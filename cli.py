@@ -16,13 +16,24 @@ from pathlib import Path
 
 import pygame
 
+import agent_server
 import controllers
+import dashboard
+import history_db
+import memory
+import metrics_export
+import profiling
+import timings
+import tournament
+import tracing
 from agents import BaseAgent
 from game import Game
-from utils import Coordinate, get_timestamped_file_path
+from utils import Coordinate, get_timestamped_file_path, timestamp
 from views import GraphicsGameView, HeadlessGameView
 
 DEBUG_LOG_DIR = Path(__file__).parent / "debug-logs"
+PROFILE_DIR = Path(__file__).parent / "profiles"
+TOURNAMENT_DIR = Path(__file__).parent / "tournament-results"
 
 
 def configure_logging(keep_previous: bool, log_level: int | None = None) -> None:
@@ -84,6 +95,93 @@ def parse_args() -> argparse.Namespace:
         type=int,
     )
 
+    argparser.add_argument(
+        "--history-db",
+        default=None,
+        help="""
+        Record the summary of every game and every tick to a SQLite database at the given path
+        (see history_db.py for the query API). The database is kept between runs.
+        """,
+        type=Path,
+    )
+    argparser.add_argument(
+        "--export-npz",
+        default=None,
+        help="""
+        Record per-tick metrics (head position, snake length, score, action and agent think time)
+        and save them to a compressed NumPy .npz file at the given path on exit.
+        """,
+        type=Path,
+    )
+    argparser.add_argument(
+        "--timings",
+        action="store_true",
+        help="""
+        Time each phase of every tick (events, agent, simulation, each on_tick hook, clock) and
+        report p50/p99/max latencies in the live display, the debug log at game over, and at exit.
+        """,
+    )
+    argparser.add_argument(
+        "--memory",
+        default=None,
+        metavar="N",
+        help="""
+        Trace allocations with tracemalloc, and every N games report the top allocation
+        differences, the deep sizes of the game history and Q table, and the peak A* frontier and
+        closed set sizes (in the debug log and the live display).
+        """,
+        type=int,
+    )
+    argparser.add_argument(
+        "--trace",
+        default=None,
+        help="""
+        Record a timeline of the most recent ticks, hooks, A* searches, stats I/O and garbage
+        collections, and save it to the given path on exit in Chrome's trace event JSON format
+        (open it in https://ui.perfetto.dev or chrome://tracing).
+        """,
+        type=Path,
+    )
+    profile_group = argparser.add_argument_group(
+        "Profiling", "Profile the run and write a hot-function report and collapsed stacks."
+    )
+    profile_group.add_argument(
+        "--profile",
+        choices=profiling.PROFILE_MODES,
+        default=None,
+        help="""
+        cprofile: deterministic (every call, high overhead);
+        sampling: sample the stack every --profile-interval seconds of CPU time (low overhead)
+        """,
+    )
+    profile_group.add_argument(
+        "--profile-ticks", type=int, default=None, help="Stop after profiling this many ticks."
+    )
+    profile_group.add_argument(
+        "--profile-games", type=int, default=None, help="Stop after profiling this many games."
+    )
+    profile_group.add_argument(
+        "--profile-interval",
+        type=float,
+        default=0.001,
+        help="Seconds of CPU time between samples of the sampling profiler.",
+    )
+    profile_group.add_argument(
+        "--profile-output",
+        type=Path,
+        default=None,
+        help="""
+        Write the report to PROFILE_OUTPUT.txt and the collapsed stacks to PROFILE_OUTPUT.folded
+        (default: profiles/<timestamp>-<profile>)
+        """,
+    )
+    argparser.add_argument(
+        "--dashboard-rate",
+        default=10.0,
+        help="Maximum number of times per second to refresh the live terminal display",
+        type=float,
+    )
+
     game_parameter_parser = argparser.add_argument_group(
         "Game Parameters", "Control parameters that influence game state."
     )
@@ -192,6 +290,24 @@ def parse_args() -> argparse.Namespace:
         dest="auto_restart",
         help="Automatically restart after losing game.",
     )
+    agent_controller_group = agent_parser.add_mutually_exclusive_group()
+    agent_controller_group.add_argument(
+        "--async",
+        action="store_true",
+        dest="plan_ahead",
+        help=(
+            "Plan the next action on a worker thread while the current frame renders and hooks run"
+            " (see controllers.AsyncAgent)."
+        ),
+    )
+    agent_controller_group.add_argument(
+        "--remote",
+        metavar="ADDRESS",
+        help=(
+            "Play with the agent served at ADDRESS (a Unix socket path or HOST:PORT) by"
+            " 'python agent_server.py AGENT --address ADDRESS', rather than in this process."
+        ),
+    )
 
     keyboard_parser = subparsers.add_parser("keyboard")
     keyboard_parser.add_argument(
@@ -199,6 +315,49 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
     )
 
+    tournament_parser = subparsers.add_parser(
+        "tournament",
+        help=(
+            "Play every combination of the given agents, seeds, grid sizes and food counts"
+            " headless, in parallel, and report the results (see tournament.py)."
+        ),
+    )
+    tournament_parser.set_defaults(tournament=True)
+    tournament_parser.add_argument(
+        "--agents",
+        nargs="+",
+        choices=agent_choices,
+        default=agent_choices,
+        help="The agents to play (default: all).",
+    )
+    tournament_parser.add_argument(
+        "--seeds", nargs="+", default=["0", "1", "2"], help="The seeds to play (default: 0 1 2)."
+    )
+    tournament_parser.add_argument(
+        "--grid-sizes",
+        nargs="+",
+        type=tournament.parse_grid_size,
+        metavar="WIDTHxHEIGHT",
+        help="The grid sizes to play, e.g., 12x8 (default: --grid-width x --grid-height).",
+    )
+    tournament_parser.add_argument(
+        "--foods", nargs="+", type=int, help="The food counts to play (default: --food)."
+    )
+    tournament_parser.add_argument(
+        "--max-ticks", type=int, default=10_000, help="End each game after this many ticks."
+    )
+    tournament_parser.add_argument(
+        "--max-seconds", type=float, default=60, help="End each game after this many seconds."
+    )
+    tournament_parser.add_argument(
+        "--workers", type=int, help="The number of worker processes (default: one per CPU)."
+    )
+    tournament_parser.add_argument(
+        "--output",
+        type=Path,
+        help=f"The results CSV file (default: a timestamped file in {TOURNAMENT_DIR.name}/).",
+    )
+
     args = argparser.parse_args()
     args.keyboard = hasattr(args, "keyboard")
     if not args.Graphics:
@@ -219,8 +378,32 @@ def main() -> None:
     args = parse_args()
 
     configure_logging(keep_previous=args.keep_logs, log_level=args.log_level)
+    if getattr(args, "tournament", False):
+        args.output = args.output or TOURNAMENT_DIR / f"{timestamp()}.csv"
+        tournament.main(args)
+        return
+    if args.history_db:
+        history_db.install(args.history_db)
+    if args.export_npz:
+        metrics_export.install(args.export_npz)
+    if args.timings:
+        timings.install()
+    if args.trace:
+        tracing.install(args.trace)
+    if args.memory:
+        memory.install(args.memory)
+    if args.profile:
+        profiling.install(
+            args.profile,
+            args.profile_output or PROFILE_DIR / f"{timestamp()}-{args.profile}",
+            ticks=args.profile_ticks,
+            games=args.profile_games,
+            interval=args.profile_interval,
+        )
+    dashboard.DASHBOARD.refresh_rate = args.dashboard_rate
 
-    random.seed(args.seed if args.seed else "seed")
+    seed = args.seed if args.seed else "seed"
+    random.seed(seed)
     game = Game(
         food=Coordinate.random(
             grid_width=args.grid_width, grid_height=args.grid_height, n=args.food
@@ -241,14 +424,24 @@ def main() -> None:
         "game_view": game_view,
         "frame_rate": args.frame_rate or (25 if args.keyboard else 0),
         "harvest": args.harvest,
+        "seed": seed,
     }
     if args.keyboard:
         controller = controllers.Keyboard(**common_controller_kwargs)
     else:
         assert args.agent
-        controller = controllers.Agent(
-            agent_class=args.agent, auto_restart=args.auto_restart, **common_controller_kwargs
-        )
+        if args.remote:
+            controller = agent_server.RemoteAgent(
+                address=agent_server.parse_address(args.remote),
+                agent=args.agent,
+                auto_restart=args.auto_restart,
+                **common_controller_kwargs,
+            )
+        else:
+            AgentController = controllers.AsyncAgent if args.plan_ahead else controllers.Agent
+            controller = AgentController(
+                agent_class=args.agent, auto_restart=args.auto_restart, **common_controller_kwargs
+            )
     controller.run()
 
 
@@ -1,20 +1,30 @@
 import abc
+import asyncio
+import atexit
 import copy
 import importlib
 import logging
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, replace
-from typing import Any, Callable, Iterable, Mapping, TypeVar
+from types import MethodType
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, Protocol, TypeVar
 
 import pygame
 from rich.live import Live
 
 import agents
-from agents import BaseAgent
+import tracing
 from game import Game
 from utils import Direction
 from views import GameView, GraphicsGameView, HeadlessGameView
 
+if TYPE_CHECKING:
+    from timings import PhaseTimings
+
 # NOTE: Not in the dataclass or abstract base because we want these to be globally defined.
 #       This allows imported hook modules to wire themselves up to a known target.
 
@@ -23,6 +33,13 @@ on_new_game: list[Callable[["Controller"], None]] = []
 on_game_over: list[Callable[["Controller"], None]] = []
 on_pygame_event: list[Callable[[pygame.event.Event], None]] = []
 
+# the priority of recorders' hooks (see ``install_recorder``), so that they run before any hook
+# that may raise Stop or Restart, and every tick and game is recorded
+RECORDER_PRIORITY = 100
+
+# set by timings.install to time each phase of every tick
+TIMINGS: "PhaseTimings | None" = None
+
 
 class Stop(Exception):
     """Signals a controller to stop the game."""
@@ -36,6 +53,230 @@ class Restart(Exception):
     pass
 
 
+class Hook:
+    """Wraps a hook function with scheduling options (see ``register``).
+
+    * every_n_ticks: only call the function on every n-th call of the hook (i.e., every n-th tick
+        for an on_tick hook), starting with the first
+    * every_seconds: only call the function if at least this many seconds have passed since it
+        was last called
+    * priority: hooks with higher priority are called first (plain functions have priority 0)
+    * threaded: call the function on a background thread, with a shallow copy of the controller,
+        so the game loop doesn't wait for it. Calls are skipped while the previous call is still
+        running. A threaded hook can't stop or restart the game (Stop and Restart are logged).
+    """
+
+    def __init__(
+        self,
+        function: Callable[..., None],
+        every_n_ticks: int = 1,
+        every_seconds: float | None = None,
+        priority: int = 0,
+        threaded: bool = False,
+    ) -> None:
+        if every_n_ticks < 1:
+            raise Exception(f"every_n_ticks must be at least 1, got {every_n_ticks=}")
+        self.function = function
+        self.every_n_ticks = every_n_ticks
+        self.every_seconds = every_seconds
+        self.priority = priority
+        self.threaded = threaded
+        self.calls = 0
+        self.last_called_at = float("-inf")
+        self._pending: queue.Queue[tuple[Any, ...]] = queue.Queue(maxsize=1)
+        self._thread: threading.Thread | None = None
+
+    def __repr__(self) -> str:
+        return f"Hook({hook_name(self)}, priority={self.priority})"
+
+    def __call__(self, *args: Any) -> None:
+        self.calls += 1
+        if (self.calls - 1) % self.every_n_ticks:
+            return
+        if self.every_seconds is not None:
+            now = time.perf_counter()
+            if now - self.last_called_at < self.every_seconds:
+                return
+            self.last_called_at = now
+        if not self.threaded:
+            self.function(*args)
+            return
+
+        if self._thread is None:
+            name = f"hook-{hook_name(self)}"
+            self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+            self._thread.start()
+        if args and isinstance(args[0], Controller):
+            # so the hook sees the state from the tick it was called for
+            args = (copy.copy(args[0]), *args[1:])
+        try:
+            self._pending.put_nowait(args)
+        except queue.Full:
+            pass  # the previous call is still running
+
+    def _run(self) -> None:
+        while True:
+            args = self._pending.get()
+            try:
+                self.function(*args)
+            except Exception:
+                logging.exception(f"Threaded hook {self!r} failed")
+            finally:
+                self._pending.task_done()
+
+    def join(self) -> None:
+        """Wait for any pending call of a threaded hook to finish."""
+        if self._thread is not None:
+            self._pending.join()
+
+
+def hook_name(hook: Callable[..., None]) -> str:
+    if isinstance(hook, Hook):
+        hook = hook.function
+    name = getattr(hook, "__name__", repr(hook))
+    if isinstance(hook, MethodType):
+        # e.g., "HistoryRecorder.on_tick" (see ``Recorder``)
+        return f"{type(hook.__self__).__name__}.{name}"
+    return name
+
+
+def register(
+    hooks: list[Callable[..., None]],
+    function: Callable[..., None],
+    every_n_ticks: int = 1,
+    every_seconds: float | None = None,
+    priority: int = 0,
+    threaded: bool = False,
+) -> Callable[..., None]:
+    """Add a hook to ``hooks`` (e.g., ``on_tick``) according to its priority, and return it.
+
+    The hook is added after every hook of the same or higher priority. Unless scheduling options
+    are given (see ``Hook``), the function itself is added, so it costs no more than appending it.
+    ``function`` may also be a ``Hook``, in which case its own options are used.
+    """
+    hook: Callable[..., None] = function
+    if isinstance(function, Hook):
+        priority = function.priority
+    elif (every_n_ticks, every_seconds, threaded) != (1, None, False) or priority != 0:
+        hook = Hook(function, every_n_ticks, every_seconds, priority, threaded)
+    index = next(
+        (i for i, other in enumerate(hooks) if getattr(other, "priority", 0) < priority),
+        len(hooks),
+    )
+    hooks.insert(index, hook)
+    return hook
+
+
+class Recorder:
+    """Records the games played, from the hooks registered by ``install_recorder``.
+
+    Subclasses override the hooks they need (the others aren't registered), and ``close``.
+    """
+
+    # the priority of on_tick, e.g., to run after every other tick hook instead
+    tick_priority = RECORDER_PRIORITY
+
+    def on_new_game(self, controller: "Controller") -> None:
+        pass
+
+    def on_tick(self, controller: "Controller", live: Live) -> None:
+        pass
+
+    def on_game_over(self, controller: "Controller") -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+R = TypeVar("R", bound=Recorder)
+
+
+def install_recorder(recorder: R) -> R:
+    """Register the hooks that ``recorder`` overrides, and close it at exit."""
+    hook_lists: list[tuple[list[Callable[..., None]], str, int]] = [
+        (on_new_game, "on_new_game", RECORDER_PRIORITY),
+        (on_tick, "on_tick", recorder.tick_priority),
+        (on_game_over, "on_game_over", RECORDER_PRIORITY),
+    ]
+    for hooks, name, priority in hook_lists:
+        if getattr(type(recorder), name) is not getattr(Recorder, name):
+            register(hooks, getattr(recorder, name), priority=priority)
+    atexit.register(recorder.close)
+    return recorder
+
+
+class NullPhaseTimer:
+    """Marks the end of each phase of a tick in the game loop, recording nothing.
+
+    See ``PhaseTimer``, used instead when --timings or --trace is enabled.
+    """
+
+    def phase_done(self, name: str) -> None:
+        pass
+
+    def hook_done(self, hook: Callable[..., None]) -> None:
+        pass
+
+    def tick_done(self, game: Game) -> None:
+        pass
+
+
+class PhaseTimer(NullPhaseTimer):
+    """Records how long each phase of a tick took, to ``timings`` and/or as trace events.
+
+    Each phase ends when the next one starts, so only one clock reading is taken per phase. The
+    phases are listed in timings.py, and the last phase of a tick ("clock") is waiting for the
+    next frame.
+    """
+
+    def __init__(self, timings: "PhaseTimings | None", tracer: tracing.Tracer | None) -> None:
+        self.timings = timings
+        self.tracer = tracer
+        self.durations: dict[str, list[int]] = {}
+        self.hook_names: dict[Callable[..., None], str] = {}
+        self.ticks = 0
+        self.tick_started_at = self.phase_started_at = time.perf_counter_ns()
+
+    def _record(self, name: str, category: str, duration_name: str) -> None:
+        now = time.perf_counter_ns()
+        if self.timings is not None:
+            if duration_name not in self.durations:
+                self.durations[duration_name] = self.timings.phase(duration_name)
+            self.durations[duration_name].append(now - self.phase_started_at)
+        if self.tracer is not None:
+            self.tracer.complete(name, category, self.phase_started_at, now)
+        self.phase_started_at = now
+
+    def phase_done(self, name: str) -> None:
+        self._record(name, "tick", name)
+
+    def hook_done(self, hook: Callable[..., None]) -> None:
+        if hook not in self.hook_names:
+            self.hook_names[hook] = hook_name(hook)
+        name = self.hook_names[hook]
+        self._record(name, "hook", f"hook:{name}")
+
+    def tick_done(self, game: Game) -> None:
+        self.phase_done("clock")
+        if self.tracer is not None:
+            self.tracer.complete(
+                "tick", "tick", self.tick_started_at, self.phase_started_at, {"tick": game.ticks}
+            )
+        self.ticks += 1
+        if self.timings is not None and self.ticks % self.timings.FLUSH_EVERY == 0:
+            self.timings.flush()
+            self.phase_started_at = time.perf_counter_ns()  # binning isn't part of the next tick
+        self.tick_started_at = self.phase_started_at
+
+
+def phase_timer() -> NullPhaseTimer:
+    """Return a timer for the game loop's phases, which only records if timing or tracing."""
+    if TIMINGS is None and tracing.TRACER is None:
+        return NullPhaseTimer()
+    return PhaseTimer(TIMINGS, tracing.TRACER)
+
+
 @dataclass
 class _ControllerMixin:
     game: Game
@@ -43,6 +284,7 @@ class _ControllerMixin:
     frame_rate: int = 0
     auto_restart: bool = False
     harvest: int | None = None
+    seed: str | None = None
 
     def __post_init__(self) -> None:
         self.initial_game_state = copy.deepcopy(self.game)
@@ -61,46 +303,71 @@ class Controller(abc.ABC, _ControllerMixin):
     def game_loop(self) -> None:
         for new_game_hook in on_new_game:
             new_game_hook(self)
+        timer = phase_timer()
         with Live(auto_refresh=False, screen=True) as live:
             while not self.game.game_over:
-                events = pygame.event.get()
-                for event_hook in on_pygame_event:
-                    for event in events:
-                        event_hook(event)
-                self.game = self.game.update(self.get_action(events=events))
-                for listener in on_tick:
-                    try:
-                        listener(self, live)
-                    except (Stop, Restart):
-                        raise
-                    except Exception as ex:
-                        raise Exception(f"A hook caused an unexpected error: {ex}")
-
+                events = self.handle_events(timer)
+                self.advance(self.get_action(events=events), live, timer)
                 self.clock.tick(self.frame_rate)
+                timer.tick_done(self.game)
+
+    def handle_events(self, timer: "NullPhaseTimer") -> list[pygame.event.Event]:
+        """Get this tick's pygame events and call the on_pygame_event hooks."""
+        events = pygame.event.get()
+        for event_hook in on_pygame_event:
+            for event in events:
+                event_hook(event)
+        timer.phase_done("events")
+        return events
+
+    def advance(self, action: Direction | None, live: Live, timer: "NullPhaseTimer") -> None:
+        """Update the game with the agent's ``action``, then call the on_tick hooks."""
+        timer.phase_done("agent")
+        self.game = self.game.update(action)
+        timer.phase_done("simulation")
+        self.updated()
+        for listener in on_tick:
+            try:
+                listener(self, live)
+            except (Stop, Restart):
+                raise
+            except Exception as ex:
+                raise Exception(f"A hook caused an unexpected error: {ex}")
+            finally:
+                timer.hook_done(listener)
+
+    def updated(self) -> None:
+        """Called after each update, before the on_tick hooks."""
 
     def game_over(self):
         for game_over_hook in on_game_over:
             game_over_hook(self)
 
     def run(self) -> None:
-        while True:  # outer "restart" loop
-            self.game = replace(self.initial_game_state)
-            if isinstance(self.game_view, GraphicsGameView):
-                self.game_view.game = self.game
-            try:
-                self.game_loop()
-            except Stop:
-                pass
-            except Restart:
-                continue
-
-            try:
-                self.game_over()
-            except Restart:
-                continue
-            else:
-                pygame.quit()
-                sys.exit()
+        try:
+            while True:  # outer "restart" loop
+                self.game = replace(self.initial_game_state)
+                if isinstance(self.game_view, GraphicsGameView):
+                    self.game_view.game = self.game
+                try:
+                    self.game_loop()
+                except Stop:
+                    pass
+                except Restart:
+                    continue
+
+                try:
+                    self.game_over()
+                except Restart:
+                    continue
+                else:
+                    pygame.quit()
+                    sys.exit()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Release anything the controller holds, when ``run`` exits (however it exits)."""
 
 
 class Keyboard(Controller):
@@ -133,7 +400,33 @@ class Keyboard(Controller):
         return direction if direction in self.game.snake.valid_actions else None
 
 
-A = TypeVar("A", bound=BaseAgent)
+class SupportsGetAction(Protocol):
+    """Anything that can be an Agent controller's agent: a BaseAgent, or a stand-in for one."""
+
+    def get_action(self, state: Game) -> Iterable[Direction | None] | Direction | None:
+        ...
+
+
+A = TypeVar("A", bound=SupportsGetAction)
+
+
+def as_action_list(
+    new_actions: Iterable[Direction | None] | Direction | None, game: Game
+) -> list[Direction | None]:
+    """Return an agent's action(s) for ``game`` as a (non-empty) list."""
+    # If this agent decided to return a single action rather than a
+    # list, we wrap it in a list anyway so we can treat both cases the same
+    match new_actions:
+        case Direction():
+            return [new_actions]
+        case None | [None] | (None,) | ():
+            direction = game.snake.direction
+            logging.info(f"Agent didn't provide an input. Continuing in {direction}")
+            return [direction]
+        case [Direction(), *_] | (Direction(), *_):
+            return list(new_actions)
+        case _:
+            raise Exception(f"Agent didn't return a valid value! {new_actions=}")
 
 
 class Agent(Controller):
@@ -171,27 +464,104 @@ class Agent(Controller):
         self.agent_instance: A = AgentClass(*agent_args, **agent_kwargs)
         self.actions: list[Direction | None] = []
         self.action_history: list[Direction | None] = []
+        # time spent in agent_instance.get_action for the most recent action (0 if it was queued)
+        self.think_time_ns = 0
+
+    def plan(self, game: Game) -> list[Direction | None]:
+        """Return the agent's next action(s) for ``game`` as a (non-empty) list."""
+        return as_action_list(self.agent_instance.get_action(game), game)
 
     def get_action(self, events: list[pygame.event.Event]) -> Direction | None:
         """Effectively acts as an adapter between Game, View, and Agent"""
+        self.think_time_ns = 0
         if len(self.actions) == 0:
-            new_actions: Iterable[Direction] | Direction | None = self.agent_instance.get_action(
-                self.game
-            )
-            # If this agent decided to return a single action rather than a
-            # list, we wrap it in a list anyway so we can treat both cases the same
-            match new_actions:
-                case Direction():
-                    self.actions = [new_actions]
-                case None | [None] | (None,) | ():
-                    direction = self.game.snake.direction
-                    logging.info(f"Agent didn't provide an input. Continuing in {direction}")
-                    self.actions = [direction]
-                case [Direction(), *_] | (Direction(), *_):
-                    self.actions = list(new_actions)
-                case _:
-                    raise Exception(f"Agent didn't return a valid value! {new_actions=}")
+            think_start = time.perf_counter_ns()
+            self.actions = self.plan(self.game)
+            self.think_time_ns = time.perf_counter_ns() - think_start
 
         next_action = self.actions.pop(0)
         self.action_history.append(next_action)
         return next_action
+
+    def close(self) -> None:
+        # e.g., to stop a Portfolio's worker processes
+        if hasattr(self.agent_instance, "close"):
+            self.agent_instance.close()
+
+
+class AsyncAgent(Agent):
+    """An Agent whose game loop (an asyncio coroutine) plans ahead on a worker thread.
+
+    As soon as a tick's state is known, the agent starts planning for it in a single-threaded
+    executor, while the on_tick hooks (rendering, stats, the live display) run and the loop waits
+    for the next frame. By the next tick the plan is usually ready, so an agent that plans for
+    less than a frame doesn't lower the frame rate. Hooks are called in the same order, with the
+    same Stop/Restart semantics and --timings/--trace phases, as in ``Controller.game_loop``
+    (the "agent" phase is only the wait for the plan).
+
+    Python code still takes turns holding the GIL, so the overlap comes from the time the loop
+    spends waiting (for the frame, or in pygame and terminal I/O), not from running Python in
+    parallel.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="planner")
+        self._planning: asyncio.Future[list[Direction | None]] | None = None
+        self._planning_for: Game | None = None
+
+    def game_loop(self) -> None:
+        for new_game_hook in on_new_game:
+            new_game_hook(self)
+        asyncio.run(self.async_game_loop())
+
+    def start_planning(self) -> None:
+        """Start planning for the current state in the executor (unless actions are queued)."""
+        if self.actions or self.game.game_over or self._planning_for is self.game:
+            return
+        self._planning_for = self.game
+        self._planning = asyncio.get_running_loop().run_in_executor(
+            self.executor, self.plan, self.game
+        )
+
+    async def next_action(self) -> Direction | None:
+        """The same as ``Agent.get_action``, but waiting for the planner rather than planning."""
+        self.think_time_ns = 0
+        if len(self.actions) == 0:
+            think_start = time.perf_counter_ns()
+            self.start_planning()
+            assert self._planning is not None
+            planning, self._planning, self._planning_for = self._planning, None, None
+            self.actions = await planning
+            self.think_time_ns = time.perf_counter_ns() - think_start
+
+        next_action = self.actions.pop(0)
+        self.action_history.append(next_action)
+        return next_action
+
+    def updated(self) -> None:
+        self.start_planning()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        super().close()
+
+    async def async_game_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        frame_seconds = 1 / self.frame_rate if self.frame_rate else 0
+        next_frame_at = loop.time()
+        timer = phase_timer()
+        with Live(auto_refresh=False, screen=True) as live:
+            try:
+                while not self.game.game_over:
+                    self.handle_events(timer)
+                    self.advance(await self.next_action(), live, timer)
+                    # like clock.tick, a late frame doesn't make the following frames early
+                    next_frame_at = max(next_frame_at + frame_seconds, loop.time())
+                    await asyncio.sleep(next_frame_at - loop.time())
+                    timer.tick_done(self.game)
+            finally:
+                # the agent mustn't still be planning when the next game starts
+                if self._planning is not None:
+                    await asyncio.gather(self._planning, return_exceptions=True)
+                self._planning, self._planning_for = None, None
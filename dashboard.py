@@ -0,0 +1,82 @@
+"""Rendering of the live terminal display on a background thread.
+
+Rendering a ``rich`` layout and writing it to the terminal is far slower than a simulation tick,
+so the ``Dashboard`` thread does it while the simulation carries on. Snapshots are only published
+while the thread is idle, so the simulation never waits for terminal I/O, and doesn't build
+snapshots that would be dropped. The on_tick hooks publishing snapshots are scheduled with
+``Dashboard.hook``, so they're called at most ``refresh_rate`` times per second.
+"""
+import logging
+import queue
+import threading
+from typing import Callable
+
+from rich.console import RenderableType
+from rich.live import Live
+
+import controllers
+import tracing
+
+
+class Dashboard:
+    def __init__(self, refresh_rate: float = 10.0) -> None:
+        self._hooks: list[controllers.Hook] = []
+        self.refresh_rate = refresh_rate
+        self._snapshot_requested = threading.Event()
+        self._snapshot_requested.set()
+        self._snapshots: queue.Queue[tuple[Live, RenderableType]] = queue.Queue(maxsize=1)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def refresh_rate(self) -> float:
+        """The maximum number of refreshes per second (no limit if 0)."""
+        return self._refresh_rate
+
+    @refresh_rate.setter
+    def refresh_rate(self, refresh_rate: float) -> None:
+        self._refresh_rate = refresh_rate
+        for hook in self._hooks:
+            hook.every_seconds = 1 / refresh_rate if refresh_rate > 0 else None
+
+    def hook(self, function: Callable[..., None]) -> controllers.Hook:
+        """Return an on_tick hook calling ``function`` at most ``refresh_rate`` times per second."""
+        hook = controllers.Hook(function)
+        self._hooks.append(hook)
+        self.refresh_rate = self.refresh_rate
+        return hook
+
+    def publish(
+        self,
+        controller: controllers.Controller,
+        live: Live,
+        snapshot: Callable[[controllers.Controller], RenderableType],
+    ) -> None:
+        """Hand a snapshot of the controller's state to the dashboard thread, if it's idle.
+
+        ``snapshot`` is only called when the dashboard thread is ready for a new frame.
+        """
+        if not self._snapshot_requested.is_set():
+            return
+        self._snapshot_requested.clear()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="dashboard", daemon=True)
+            self._thread.start()
+        self._snapshots.put((live, snapshot(controller)))
+
+    def _run(self) -> None:
+        while True:
+            live, renderable = self._snapshots.get()
+            try:
+                if live.is_started:
+                    self._refresh(live, renderable)
+            except Exception:
+                logging.exception("Dashboard refresh failed")
+            self._snapshot_requested.set()
+
+    @staticmethod
+    @tracing.traced("Dashboard.refresh", "dashboard")
+    def _refresh(live: Live, renderable: RenderableType) -> None:
+        live.update(renderable, refresh=True)
+
+
+DASHBOARD = Dashboard()
@@ -1,9 +1,19 @@
 import logging
+import struct
 from dataclasses import dataclass, field, replace
+from functools import cache
+from itertools import chain
 
 from serializers import SerializerMixin
 from snake import Snake
-from utils import Coordinate, Direction
+from utils import Coordinate, Direction, coordinate_table
+
+FOOD_SYMBOL = "🍎"
+BLANK_SYMBOL = "🔵"
+SNAKE_SYMBOL = "🐍"
+# grid_width, grid_height, score, ticks and number of food, followed by an (X, Y) pair of int16s
+# for each food and finally the snake (see Snake.to_bytes)
+_GAME_HEADER = struct.Struct("<HHIIH")
 
 
 @dataclass(frozen=True, eq=True, order=True, kw_only=True, slots=True)
@@ -27,10 +37,12 @@ class Game(SerializerMixin):
     # of our representation of game state
     ticks: int = field(default=0, compare=False)
 
-    def to_ascii(self):
-        FOOD_SYMBOL = "🍎"
-        BLANK_SYMBOL = "🔵"
-        SNAKE_SYMBOL = "🐍"
+    def to_ascii(self, renderer: "AsciiRenderer | None" = None) -> str:
+        """Render the grid, incrementally with ``renderer`` (kept by the caller, e.g., per view)."""
+        return self._to_ascii_full() if renderer is None else renderer.render(self)
+
+    def _to_ascii_full(self):
+        """Render the whole grid from scratch (see ``AsciiRenderer`` for incremental rendering)."""
         horizontal_border_row = ["☰" for _ in range(int((self.grid_width) * 2 + 2))]
         grid_row = ["║"] + [BLANK_SYMBOL for _ in range(self.grid_width)] + ["║"]
         grid = [grid_row.copy() for _ in range(self.grid_height)]
@@ -57,6 +69,37 @@ class Game(SerializerMixin):
 
         return "\n".join("".join(line) for line in grid)
 
+    def to_bytes(self) -> bytes:
+        """Return a compact binary encoding of the game (see ``from_bytes``).
+
+        Useful for shipping states between processes without pickling.
+        """
+        food = sorted(self.food)
+        return b"".join(
+            (
+                _GAME_HEADER.pack(
+                    self.grid_width, self.grid_height, self.score, self.ticks, len(food)
+                ),
+                struct.pack(f"<{2 * len(food)}h", *chain.from_iterable(food)),
+                self.snake.to_bytes(),
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes | memoryview) -> "Game":
+        """Return the game encoded by ``to_bytes``."""
+        grid_width, grid_height, score, ticks, food_count = _GAME_HEADER.unpack_from(data)
+        xys = struct.unpack_from(f"<{2 * food_count}h", data, _GAME_HEADER.size)
+        snake_offset = _GAME_HEADER.size + 4 * food_count
+        return cls(
+            grid_width=grid_width,
+            grid_height=grid_height,
+            snake=Snake.from_bytes(memoryview(data)[snake_offset:]),
+            food=frozenset(map(Coordinate, xys[::2], xys[1::2])),
+            score=score,
+            ticks=ticks,
+        )
+
     @property
     def game_over(self) -> bool:
         return self._check_game_over()
@@ -76,13 +119,28 @@ class Game(SerializerMixin):
             exclude=self.food, grid_width=self.grid_width, grid_height=self.grid_height, n=1
         )
 
-    def update(self, direction: Direction | None = None) -> "Game":
+    def update(
+        self,
+        direction: Direction | None = None,
+        spawned_food: frozenset[Coordinate] | None = None,
+    ) -> "Game":
+        """Return the next state after moving the snake in ``direction``.
+
+        When the snake eats, new food is spawned at random unless ``spawned_food`` is given
+        (e.g., when replaying a recorded game).
+        """
         if self.game_over:
             raise Exception(f"Can't update a game when {self.game_over=}.")
 
         eating = self.food_at(self.snake.head)
-        new_food = (frozenset(self.food) - eating) | (self.spawn_food() if eating else frozenset())
-        new_snake = self.snake.move(direction=direction, grow=len(eating) > 0)
+        new_food = frozenset(self.food) - eating
+        if eating:
+            new_food |= self.spawn_food() if spawned_food is None else spawned_food
+        new_snake = self.snake.move(
+            direction=direction,
+            grow=len(eating) > 0,
+            neighbors=coordinate_table(self.grid_width, self.grid_height).neighbors,
+        )
         new_state_changes = {
             "ticks": self.ticks + 1,
             "snake": new_snake,
@@ -131,3 +189,93 @@ class Game(SerializerMixin):
         (next_state,) = (s for s in self.successors if s.snake.direction == action)
         score_delta = float(-1) if next_state.game_over else float(next_state.score - self.score)
         return (next_state, score_delta)
+
+
+def cell_changes(previous: Game, current: Game) -> set[Coordinate] | None:
+    """Return the cells whose contents may differ between two consecutive states.
+
+    Returns None if ``current`` isn't the state immediately following ``previous`` (or either is
+    game over), in which case every cell should be considered changed.
+    """
+    old, new = previous.snake.segments, current.snake.segments
+    consecutive = (
+        current.ticks == previous.ticks + 1
+        and current.grid_width == previous.grid_width
+        and current.grid_height == previous.grid_height
+        and len(new) - len(old) in (0, 1)
+        # the body in between only moved along if its ends did (as in every Game.update)
+        and (len(new) == 1 or (new[1] == old[0] and new[-1] == old[len(new) - 2]))
+    )
+    if not consecutive or previous.game_over or current.game_over:
+        return None
+    # the new head, the vacated tail (if the snake didn't grow) and any food eaten or spawned
+    return {new[0], old[-1]} | (previous.food ^ current.food)
+
+
+@cache
+def _ascii_template(grid_width: int, grid_height: int) -> tuple[tuple[str, ...], ...]:
+    """Return the rows of an empty grid (including borders)."""
+    horizontal_border_row = ("☰",) * (grid_width * 2 + 2)
+    grid_row = ("║",) + (BLANK_SYMBOL,) * grid_width + ("║",)
+    return (horizontal_border_row,) + (grid_row,) * grid_height + (horizontal_border_row,)
+
+
+class AsciiRenderer:
+    """Renders games as ASCII art, only redrawing the cells that changed since the last frame.
+
+    Rendering a state that immediately follows the previously rendered state costs O(changed
+    cells) (rather than O(grid_width * grid_height)). Any other state is rendered from a cached
+    template of the empty grid.
+    """
+
+    def __init__(self) -> None:
+        self.previous: Game | None = None
+        self.grid: list[list[str]] = []
+        self.lines: list[str] = []
+        self.text = ""
+
+    def render(self, game: Game) -> str:
+        if game is self.previous:
+            return self.text
+        changes = cell_changes(self.previous, game) if self.previous is not None else None
+        if game.game_over:
+            # game over states may be out of bounds; keep the original rendering behavior
+            self.previous = None
+            return game._to_ascii_full()
+        if changes is None:
+            self._redraw(game)
+        else:
+            self._patch(game, changes)
+        self.previous = game
+        self.text = "\n".join(self.lines)
+        return self.text
+
+    def _redraw(self, game: Game) -> None:
+        self.grid = [list(row) for row in _ascii_template(game.grid_width, game.grid_height)]
+        for segment in game.snake.segments:
+            self.grid[segment.Y + 1][segment.X + 1] = SNAKE_SYMBOL
+        for food in game.food:
+            self.grid[food.Y + 1][food.X + 1] = FOOD_SYMBOL
+        self.lines = ["".join(row) for row in self.grid]
+
+    def _patch(self, game: Game, cells: set[Coordinate]) -> None:
+        assert self.previous is not None
+        dirty_rows = set()
+        for cell in cells:
+            self.grid[cell.Y + 1][cell.X + 1] = changed_cell_symbol(self.previous, game, cell)
+            dirty_rows.add(cell.Y + 1)
+        for row in dirty_rows:
+            self.lines[row] = "".join(self.grid[row])
+
+
+def changed_cell_symbol(previous: Game, current: Game, cell: Coordinate) -> str:
+    """Return the symbol for ``cell`` in ``current``, given that it's one of ``cell_changes``."""
+    if cell in current.food:
+        return FOOD_SYMBOL
+    if cell == current.snake.head:
+        return SNAKE_SYMBOL
+    if cell == previous.snake.tail:
+        grew = len(current.snake.segments) > len(previous.snake.segments)
+        return SNAKE_SYMBOL if grew else BLANK_SYMBOL
+    # food was eaten or spawned here, which is rare enough to search the snake
+    return SNAKE_SYMBOL if cell in current.snake.segments else BLANK_SYMBOL
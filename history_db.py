@@ -0,0 +1,218 @@
+"""Optional SQLite store of game and tick history, with a small query API for analysis.
+
+Unlike the files in game-stats/, the database is never cleaned up automatically, so it can
+accumulate many runs. Enable it with ``./run --history-db PATH ...`` (or ``install(PATH)``), then
+query it, e.g., from a notebook:
+
+    store = HistoryStore("history.sqlite")
+    games = store.games(agent="Hungry")              # dict of column name -> numpy array
+    ticks = store.ticks(run_id=games["run_id"][0], as_dataframe=True)  # requires pandas
+"""
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+import controllers
+from game import Game
+from replay import DIRECTION_INDEX
+from utils import timestamp
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    run_id TEXT NOT NULL,
+    game_number INTEGER NOT NULL,
+    agent TEXT NOT NULL,
+    seed TEXT,
+    grid_width INTEGER NOT NULL,
+    grid_height INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    PRIMARY KEY (run_id, game_number)
+);
+CREATE TABLE IF NOT EXISTS ticks (
+    run_id TEXT NOT NULL,
+    game_number INTEGER NOT NULL,
+    tick INTEGER NOT NULL,
+    head_x INTEGER NOT NULL,
+    head_y INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    action INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_agent ON games (agent);
+CREATE INDEX IF NOT EXISTS games_by_seed ON games (seed);
+CREATE INDEX IF NOT EXISTS ticks_by_run ON ticks (run_id, game_number, tick);
+"""
+GAME_COLUMNS = (
+    "run_id",
+    "game_number",
+    "agent",
+    "seed",
+    "grid_width",
+    "grid_height",
+    "score",
+    "ticks",
+)
+TICK_COLUMNS = ("run_id", "game_number", "tick", "head_x", "head_y", "length", "score", "action")
+
+
+class HistoryStore:
+    """Batched writer and query interface for a SQLite history database (in WAL mode).
+
+    Tick rows are buffered and inserted ``batch_size`` at a time; call ``flush`` (or ``close``)
+    to write any buffered rows.
+    """
+
+    def __init__(self, path: Path | str, batch_size: int = 10_000) -> None:
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._pending_ticks: list[tuple[Any, ...]] = []
+
+    def record_game(
+        self, run_id: str, game_number: int, agent: str, seed: str | None, game: Game
+    ) -> None:
+        """Insert (or update) the summary row of a game."""
+        self.connection.execute(
+            f"INSERT OR REPLACE INTO games VALUES ({', '.join('?' * len(GAME_COLUMNS))})",
+            (
+                run_id,
+                game_number,
+                agent,
+                seed,
+                game.grid_width,
+                game.grid_height,
+                game.score,
+                game.ticks,
+            ),
+        )
+
+    def record_tick(self, run_id: str, game_number: int, game: Game) -> None:
+        """Buffer a tick row (the action is the direction the snake moved to reach ``game``)."""
+        head = game.snake.head
+        self._pending_ticks.append(
+            (
+                run_id,
+                game_number,
+                game.ticks,
+                head.X,
+                head.Y,
+                len(game.snake.segments),
+                game.score,
+                DIRECTION_INDEX[game.snake.direction],
+            )
+        )
+        if len(self._pending_ticks) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO ticks VALUES ({', '.join('?' * len(TICK_COLUMNS))})",
+                self._pending_ticks,
+            )
+        self._pending_ticks.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+    def query(self, sql: str, parameters: tuple[Any, ...] = (), as_dataframe: bool = False):
+        """Run a query and return its columns as NumPy arrays (or a pandas DataFrame)."""
+        cursor = self.connection.execute(sql, parameters)
+        names = [description[0] for description in cursor.description]
+        rows = cursor.fetchall()
+        if as_dataframe:
+            import pandas  # optional dependency, only needed for DataFrames
+
+            return pandas.DataFrame.from_records(rows, columns=names)
+        columns = zip(*rows) if rows else ((),) * len(names)
+        return {name: np.asarray(column) for name, column in zip(names, columns)}
+
+    def games(
+        self,
+        run_id: str | None = None,
+        agent: str | None = None,
+        seed: str | None = None,
+        as_dataframe: bool = False,
+    ):
+        """Return game summaries, optionally filtered by run, agent and/or seed."""
+        where, parameters = _where(run_id=run_id, agent=agent, seed=seed)
+        return self.query(
+            f"SELECT * FROM games{where} ORDER BY run_id, game_number", parameters, as_dataframe
+        )
+
+    def ticks(
+        self,
+        run_id: str | None = None,
+        game_number: int | None = None,
+        as_dataframe: bool = False,
+    ):
+        """Return tick history, optionally filtered by run and/or game."""
+        where, parameters = _where(run_id=run_id, game_number=game_number)
+        return self.query(
+            f"SELECT * FROM ticks{where} ORDER BY run_id, game_number, tick",
+            parameters,
+            as_dataframe,
+        )
+
+
+def _where(**filters: Any) -> tuple[str, tuple[Any, ...]]:
+    """Return a WHERE clause (and its parameters) matching every filter that isn't None."""
+    filters = {column: value for column, value in filters.items() if value is not None}
+    if not filters:
+        return "", ()
+    return " WHERE " + " AND ".join(f"{column} = ?" for column in filters), tuple(filters.values())
+
+
+RUN_ID = timestamp()
+
+
+def agent_name(controller: controllers.Controller) -> str:
+    agent = getattr(controller, "agent_instance", None)
+    return type(agent or controller).__name__
+
+
+class HistoryRecorder(controllers.Recorder):
+    """Records every game played by this process to ``store``."""
+
+    def __init__(self, store: HistoryStore) -> None:
+        self.store = store
+        self.game_number = 0
+        self.agent = ""
+        self.seed: str | None = None
+        self.latest_game: Game | None = None
+
+    def record_latest_game(self) -> None:
+        if self.latest_game is not None:
+            self.store.record_game(
+                RUN_ID, self.game_number, self.agent, self.seed, self.latest_game
+            )
+
+    def on_new_game(self, controller: controllers.Controller) -> None:
+        self.record_latest_game()  # the previous game may have been restarted before game over
+        self.game_number += 1
+        self.agent, self.seed = agent_name(controller), controller.seed
+        self.latest_game = controller.game
+
+    def on_tick(self, controller: controllers.Controller, *args: Any) -> None:
+        self.latest_game = controller.game
+        self.store.record_tick(RUN_ID, self.game_number, controller.game)
+
+    def on_game_over(self, controller: controllers.Controller) -> None:
+        self.latest_game = controller.game
+        self.record_latest_game()
+
+    def close(self) -> None:
+        self.record_latest_game()
+        self.store.close()
+
+
+def install(path: Path | str) -> HistoryStore:
+    """Open the history database at ``path`` and register hooks to record every game to it."""
+    return controllers.install_recorder(HistoryRecorder(HistoryStore(path))).store
@@ -1,5 +1,5 @@
 """Controller hooks for introspecting game state changes over time."""
-import math
+import heapq
 import sys
 import time
 from typing import Any, Callable
@@ -12,9 +12,13 @@ from rich.table import Table
 
 import agents
 import controllers
+import dashboard
+import memory
 import stats
+import tracing
 import views
 from controllers import Controller
+from game import AsciiRenderer
 
 
 def get_agent_if_q(controller: Controller):
@@ -24,7 +28,11 @@ def get_agent_if_q(controller: Controller):
 
 
 def register_new_game_with_stats(controller: Controller):
-    stats.GameStats.new_game(controller.game)
+    stats.GameStats.new_game(controller.game, seed=controller.seed)
+
+
+def export_game_stats(controller: Controller):
+    stats.GameStats.finish_game(controller.game)
 
 
 def auto_restart_on_game_over(controller: Controller):
@@ -55,11 +63,53 @@ def update_game_stats(controller: Controller, *args: Any, **kwargs: Any):
 
 
 def update_live_display(controller: Controller, live: Live):
+    """Hand the live display a snapshot, unless it's still showing the previous one."""
+    dashboard.DASHBOARD.publish(controller, live, snapshot=build_live_display)
+
+
+# the number of Q values (lowest first) shown in the live display
+Q_VALUE_ROWS = 50
+# renders the live display's ASCII panel, incrementally from tick to tick
+ASCII_PANEL_RENDERER = AsciiRenderer()
+
+
+class LowestQValues:
+    """A table of the lowest ``Q_VALUE_ROWS`` Q values, found when the table is rendered.
+
+    The live display is rendered on the dashboard thread, so the game loop only hands over a
+    reference to Q, rather than scanning it.
+    """
+
+    def __init__(self, Q: dict[Any, float]) -> None:
+        self.Q = Q
+
+    def __rich__(self) -> Table:
+        table = Table("<-🍎", "🍎->", "🍎^", "🍎v", "<-🐍", "🐍->", "🐍^", "🐍v", "act", "$")
+        # (copied first, because the game loop or an AsyncAgent's planner may be updating Q)
+        q_values = list(self.Q.items())
+        for (state, action), value in heapq.nsmallest(Q_VALUE_ROWS, q_values, key=lambda e: e[1]):
+            table.add_row(*[str(r) for r in state + (action, value)])
+        return table
+
+
+@tracing.traced("build_live_display", "dashboard")
+def build_live_display(controller: Controller) -> Layout:
     game_table = stats.GameStats.live_display()
     game_layout = Layout(game_table, name="game table")
-    ascii_layout = Layout(Panel(controller.game.to_ascii()), name="ascii panel")
+    summary_layout = Layout(stats.GameStats.summary_display(), name="summary table", size=8)
+    stats_layout = Layout(name="stats")
+    stats_layout.split_column(game_layout, summary_layout)
+    if controllers.TIMINGS is not None:
+        timings_table = controllers.TIMINGS.table()
+        timings_size = timings_table.row_count + 4
+        stats_layout.add_split(Layout(timings_table, name="timings", size=timings_size))
+    if memory.MONITOR is not None and memory.MONITOR.latest is not None:
+        memory_table = memory.MONITOR.latest.table()
+        memory_size = memory_table.row_count + 5
+        stats_layout.add_split(Layout(memory_table, name="memory", size=memory_size))
+    ascii_layout = Layout(Panel(controller.game.to_ascii(ASCII_PANEL_RENDERER)), name="ascii panel")
     base_layout = Layout()
-    base_layout.split_row(game_layout, ascii_layout)
+    base_layout.split_row(stats_layout, ascii_layout)
     agent: agents.QQ
     if agent := get_agent_if_q(controller):
         column_headers = [
@@ -72,18 +122,18 @@ def update_live_display(controller: Controller, live: Live):
             "sum(Q)",
         ]
         q_summary_table = Table(*column_headers)
-        vals = agent.Q.values()
+        q_summary = agent.Q_summary
         q_summary_table.add_row(
             *(
                 str(e)
                 for e in (
-                    len(vals),
-                    sum(1 for v in vals if v > 0),
-                    sum(1 for v in vals if v == 0),
-                    sum(1 for v in vals if v < 0),
-                    sum(1 for v in vals if math.isnan(v)),
-                    sum(1 for v in vals if v == float("-inf")),
-                    sum(v for v in vals if v != float("-inf") and not math.isnan(v)),
+                    q_summary.total,
+                    q_summary.positive,
+                    q_summary.zero,
+                    q_summary.negative,
+                    q_summary.nan,
+                    q_summary.negative_infinite,
+                    q_summary.total_sum,
                 )
             )
         )
@@ -103,19 +153,10 @@ def update_live_display(controller: Controller, live: Live):
             str(agent.exploration_rate_decay),
             str(agent.discount),
         )
-        q_value_table = Table("<-🍎", "🍎->", "🍎^", "🍎v", "<-🐍", "🐍->", "🐍^", "🐍v", "act", "$")
-        q_value_items = sorted(agent.Q.items(), key=lambda e: e[1])
-        q_value_items_joined = [
-            state + (action,) + (value,) for (state, action), value in q_value_items
-        ]
-        for row in q_value_items_joined:
-            q_value_table.add_row(*[str(r) for r in row])
-
         base_layout["game table"].split(
-            Layout(q_agent_table), Layout(q_summary_table), Layout(q_value_table, ratio=2)
+            Layout(q_agent_table), Layout(q_summary_table), Layout(LowestQValues(agent.Q), ratio=2)
         )
-    live.update(base_layout)
-    live.refresh()
+    return base_layout
 
 
 def update_game_view(controller: Controller, live: Live):
@@ -141,8 +182,13 @@ def keyboard_control(key_event: pygame.event.Event):
             pass
 
 
+# Hooks may be plain functions or controllers.Hook instances with scheduling options.
+# update_game_stats records every state (for the game-history files and replays), so it runs
+# with the recorders (e.g., history_db, metrics_export), and stop_for_harvest runs last. The live
+# display is updated at most --dashboard-rate times per second.
 on_new_game: list[Callable[[Controller], None]] = [register_new_game_with_stats]
 on_game_over: list[Callable[[Controller], None]] = [
+    export_game_stats,
     auto_restart_on_game_over,
     graphics_game_over,
     headless_game_over,
@@ -150,13 +196,16 @@ on_game_over: list[Callable[[Controller], None]] = [
 ]
 on_tick: list[Callable[[Controller, Live], None]] = [
     update_game_view,
-    update_game_stats,
-    update_live_display,
-    stop_for_harvest,
+    controllers.Hook(update_game_stats, priority=controllers.RECORDER_PRIORITY),
+    dashboard.DASHBOARD.hook(update_live_display),
+    controllers.Hook(stop_for_harvest, priority=-100),
 ]
 on_pygame_event: list[Callable[[pygame.event.Event], None]] = [keyboard_control]
 
-controllers.on_tick.extend(on_tick)
-controllers.on_new_game.extend(on_new_game)
+for tick_hook in on_tick:
+    controllers.register(controllers.on_tick, tick_hook)
+for new_game_hook in on_new_game:
+    controllers.register(controllers.on_new_game, new_game_hook)
+for game_over_hook in on_game_over:
+    controllers.register(controllers.on_game_over, game_over_hook)
 controllers.on_pygame_event.extend(on_pygame_event)
-controllers.on_game_over.extend(on_game_over)
@@ -0,0 +1,183 @@
+"""Memory footprint instrumentation (enable with ``./run --memory N ...``).
+
+Every N games, a ``MemoryReport`` is taken at game over:
+
+* the current and peak size of memory traced by ``tracemalloc``, and the source lines whose
+  allocations grew the most since the previous report
+* deep size estimates (see ``deep_sizeof``) of ``GameStats.full_history`` and, for Q-learning
+  agents, the Q table
+* the largest A* frontier and closed set sizes so far (see ``agents.SEARCH_STATS``)
+
+Reports are written to the debug log and shown in the live display. Note that ``tracemalloc``
+slows down every allocation, so expect the run to be noticeably slower while enabled.
+"""
+import logging
+import sys
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass, field
+from types import FunctionType, ModuleType
+from typing import Any
+
+from rich.table import Table
+
+import agents
+import controllers
+import stats
+
+# the number of source lines listed in a report's top allocation differences
+TOP_ALLOCATIONS = 10
+
+
+def deep_sizeof(obj: Any) -> int:
+    """Estimate the memory used by ``obj`` and everything it references, in bytes.
+
+    Objects referenced more than once (e.g., states shared between histories) are only counted
+    once, and classes, functions and modules aren't counted at all.
+    """
+    seen: set[int] = set()
+    size = 0
+    pending = [obj]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, (type, FunctionType, ModuleType)):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            pending.extend(obj)
+        elif not isinstance(obj, (str, bytes, int, float)):
+            if hasattr(obj, "__dict__"):
+                pending.append(vars(obj))
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(obj, slot):
+                        pending.append(getattr(obj, slot))
+    return size
+
+
+@dataclass
+class MemoryReport:
+    games: int
+    traced_current: int
+    traced_peak: int
+    top_allocations: list[tuple[str, int, int]] = field(default_factory=list)
+    """source line, size difference and count difference since the previous report"""
+    full_history_size: int = 0
+    full_history_states: int = 0
+    q_table_size: int | None = None
+    q_table_entries: int | None = None
+    search_stats: agents.SearchStats = field(default_factory=agents.SearchStats)
+
+    def table(self) -> Table:
+        """Return the report (without the top allocations) in a rich.table.Table"""
+        table = Table("memory", "value", title=f"Memory after {self.games} games")
+        table.add_row("traced (current)", format_bytes(self.traced_current))
+        table.add_row("traced (peak)", format_bytes(self.traced_peak))
+        table.add_row(
+            "GameStats.full_history",
+            f"{format_bytes(self.full_history_size)} ({self.full_history_states} states)",
+        )
+        if self.q_table_size is not None:
+            table.add_row(
+                "QQ.Q", f"{format_bytes(self.q_table_size)} ({self.q_table_entries} entries)"
+            )
+        if self.search_stats.searches:
+            table.add_row(
+                "A* peak frontier/closed",
+                f"{self.search_stats.peak_frontier}/{self.search_stats.peak_closed}",
+            )
+        return table
+
+    def __str__(self) -> str:
+        lines = [
+            f"Memory after {self.games} games:",
+            f"  traced: {format_bytes(self.traced_current)}"
+            f" (peak {format_bytes(self.traced_peak)})",
+            f"  GameStats.full_history: {format_bytes(self.full_history_size)}"
+            f" ({self.full_history_states} states)",
+        ]
+        if self.q_table_size is not None:
+            lines.append(
+                f"  QQ.Q: {format_bytes(self.q_table_size)} ({self.q_table_entries} entries)"
+            )
+        if self.search_stats.searches:
+            lines.append(
+                f"  A* ({self.search_stats.searches} searches): peak frontier"
+                f" {self.search_stats.peak_frontier}, peak closed {self.search_stats.peak_closed}"
+            )
+        lines.append("  top allocation differences since the previous report:")
+        for source, size_diff, count_diff in self.top_allocations:
+            size = format_bytes(size_diff, signed=True)
+            lines.append(f"    {size} ({count_diff:+} blocks) {source}")
+        return "\n".join(lines)
+
+
+def format_bytes(size: int, signed: bool = False) -> str:
+    sign = "+" if signed and size >= 0 else ""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{sign}{size:.0f}{unit}" if unit == "B" else f"{sign}{size:.1f}{unit}"
+        size /= 1024  # type: ignore[assignment]
+    return f"{sign}{size:.1f}GiB"
+
+
+class MemoryMonitor(controllers.Recorder):
+    """Takes a ``MemoryReport`` every ``every_n_games`` games (see ``report``), once installed."""
+
+    def __init__(self, every_n_games: int = 10, frames: int = 1) -> None:
+        self.every_n_games = every_n_games
+        self.games = 0
+        self.latest: MemoryReport | None = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._snapshot = self.take_snapshot()
+
+    @staticmethod
+    def take_snapshot() -> tracemalloc.Snapshot:
+        # excluding tracemalloc's own allocations (e.g., of previous snapshots)
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+
+    def report(self, controller: controllers.Controller) -> MemoryReport:
+        snapshot = self.take_snapshot()
+        differences = snapshot.compare_to(self._snapshot, "lineno")[:TOP_ALLOCATIONS]
+        self._snapshot = snapshot
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+        report = MemoryReport(
+            games=self.games,
+            traced_current=traced_current,
+            traced_peak=traced_peak,
+            top_allocations=[
+                (str(difference.traceback), difference.size_diff, difference.count_diff)
+                for difference in differences
+            ],
+            full_history_size=deep_sizeof(stats.GameStats.full_history),
+            full_history_states=len(stats.GameStats.full_history),
+            search_stats=agents.SearchStats(**vars(agents.SEARCH_STATS)),
+        )
+        agent = getattr(controller, "agent_instance", None)
+        if isinstance(agent, agents.QQ):
+            report.q_table_size = deep_sizeof(agent.Q)
+            report.q_table_entries = len(agent.Q)
+        self.latest = report
+        return report
+
+    def on_game_over(self, controller: controllers.Controller) -> None:
+        self.games += 1
+        if self.games % self.every_n_games == 0:
+            logging.info(str(self.report(controller)))
+
+
+MONITOR: MemoryMonitor | None = None
+
+
+def install(every_n_games: int = 10) -> MemoryMonitor:
+    """Start tracing allocations, and report memory use every ``every_n_games`` games."""
+    global MONITOR
+    MONITOR = controllers.install_recorder(MemoryMonitor(every_n_games))
+    return MONITOR
@@ -0,0 +1,86 @@
+"""Columnar export of per-tick metrics to compressed NumPy ``.npz`` files.
+
+Each column is accumulated in a typed ``array.array`` buffer and saved with
+``numpy.savez_compressed``, so loading is a single ``numpy.load`` call and analysis can be
+vectorized, e.g.:
+
+    metrics = numpy.load("run.npz")
+    think_time_ns_in_game_3 = metrics["think_time_ns"][metrics["game"] == 3]
+
+Enable it with ``./run --export-npz PATH ...`` (or ``install(PATH)``); the file is written when
+the process exits.
+"""
+from array import array
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+import controllers
+from game import Game
+from replay import DIRECTION_INDEX
+
+# column name -> array.array typecode
+COLUMNS = {
+    "game": "I",
+    "tick": "I",
+    "head_x": "h",
+    "head_y": "h",
+    "length": "I",
+    "score": "I",
+    "action": "b",  # index into replay.DIRECTIONS
+    "think_time_ns": "q",
+}
+
+
+class TickMetricsRecorder(controllers.Recorder):
+    """Accumulates one row of metrics per tick into typed column buffers.
+
+    Once installed (see ``install``), it records every tick played by this process, and saves
+    the metrics to ``path`` (if given) when closed.
+    """
+
+    def __init__(self, path: Path | str | None = None) -> None:
+        self.columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        self.path = path
+        self.game_number = 0
+
+    def __len__(self) -> int:
+        return len(self.columns["tick"])
+
+    def record(self, game_number: int, game: Game, think_time_ns: int = 0) -> None:
+        columns = self.columns
+        head = game.snake.head
+        columns["game"].append(game_number)
+        columns["tick"].append(game.ticks)
+        columns["head_x"].append(head.X)
+        columns["head_y"].append(head.Y)
+        columns["length"].append(len(game.snake.segments))
+        columns["score"].append(game.score)
+        columns["action"].append(DIRECTION_INDEX[game.snake.direction])
+        columns["think_time_ns"].append(think_time_ns)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Return each column as a NumPy array (sharing memory with the buffers; no copies)."""
+        return {
+            name: np.frombuffer(column, dtype=column.typecode)
+            for name, column in self.columns.items()
+        }
+
+    def save(self, path: Path | str) -> None:
+        np.savez_compressed(path, **self.to_arrays())
+
+    def on_new_game(self, controller: controllers.Controller) -> None:
+        self.game_number += 1
+
+    def on_tick(self, controller: controllers.Controller, *args: Any) -> None:
+        self.record(self.game_number, controller.game, getattr(controller, "think_time_ns", 0))
+
+    def close(self) -> None:
+        if self.path is not None:
+            self.save(self.path)
+
+
+def install(path: Path | str) -> TickMetricsRecorder:
+    """Register hooks recording every tick, and save the metrics to ``path`` at exit."""
+    return controllers.install_recorder(TickMetricsRecorder(path))
@@ -0,0 +1,222 @@
+"""Built-in profiling of a run (enable with ``./run --profile {cprofile,sampling} ...``).
+
+Two profilers are available:
+
+* cprofile: deterministic profiling of every call with ``cProfile`` (accurate call counts, but
+    slows everything down, especially code making many small calls)
+* sampling: records the main thread's stack every ``interval`` seconds of CPU time, using a
+    ``SIGPROF`` interval timer (low overhead, but statistical; Unix only)
+
+After ``--profile-ticks`` ticks or ``--profile-games`` games (or when the process exits), two
+files are written next to each other:
+
+* PREFIX.txt: the hottest functions, sorted by time spent in the function itself
+* PREFIX.folded: collapsed stacks ("outer;inner;leaf weight" lines) for flamegraph tools, e.g.,
+    https://github.com/brendangregg/FlameGraph or https://www.speedscope.app
+
+The cProfile profiler only records callers, not whole stacks, so its collapsed stacks are
+reconstructed by splitting each function's time between its callers in proportion to the time
+spent on their behalf.
+"""
+import cProfile
+import io
+import os
+import pstats
+import signal
+import sys
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+import controllers
+
+# the number of functions in the hot-function report
+REPORT_ROWS = 40
+
+
+def frame_label(filename: str, line_number: int, function_name: str) -> str:
+    return f"{function_name} ({os.path.basename(filename)}:{line_number})"
+
+
+class SamplingProfiler:
+    """Samples the main thread's stack every ``interval`` seconds of CPU time (on ``SIGPROF``)."""
+
+    def __init__(self, interval: float = 0.001) -> None:
+        if not hasattr(signal, "setitimer"):
+            raise Exception("The sampling profiler requires signal.setitimer (i.e., Unix)")
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+
+    def _sample(self, signal_number: int, frame: FrameType | None) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        if stack:
+            self.stacks[tuple(reversed(stack))] += 1
+
+    def enable(self) -> None:
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def disable(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def collapsed_stacks(self) -> Counter[str]:
+        """Return the number of samples of each stack, keyed by ";"-joined frames."""
+        return Counter({";".join(stack): count for stack, count in self.stacks.items()})
+
+    def report(self, rows: int = REPORT_ROWS) -> str:
+        self_samples: Counter[str] = Counter()
+        total_samples: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            self_samples[stack[-1]] += count
+            for label in set(stack):  # recursive functions are only counted once per sample
+                total_samples[label] += count
+        sample_count = sum(self.stacks.values()) or 1
+        lines = [
+            f"{sample_count} samples every {self.interval * 1e3:g}ms of CPU time",
+            "",
+            f"{'self %':>8} {'total %':>8}  function",
+        ]
+        for label, count in self_samples.most_common(rows):
+            self_percent = 100 * count / sample_count
+            total_percent = 100 * total_samples[label] / sample_count
+            lines.append(f"{self_percent:8.2f} {total_percent:8.2f}  {label}")
+        return "\n".join(lines) + "\n"
+
+
+class DeterministicProfiler:
+    """Profiles every call with ``cProfile``."""
+
+    # stacks carrying less than this many seconds aren't split further between callers
+    MIN_STACK_SECONDS = 1e-6
+    MAX_STACK_DEPTH = 64
+
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+
+    def enable(self) -> None:
+        self.profile.enable()
+
+    def disable(self) -> None:
+        self.profile.disable()
+
+    def collapsed_stacks(self) -> Counter[str]:
+        """Return the (estimated) microseconds spent in each stack, keyed by ";"-joined frames."""
+        stats: dict[Any, Any] = pstats.Stats(self.profile).stats  # type: ignore[attr-defined]
+        stacks: Counter[str] = Counter()
+        # (function, seconds to split between its callers, the stack below it, functions in it)
+        pending: list[tuple[Any, float, tuple[str, ...], frozenset[Any]]] = [
+            (function, self_seconds, (), frozenset())
+            for function, (_, _, self_seconds, _, _) in stats.items()
+            if self_seconds > 0
+        ]
+        while pending:
+            function, seconds, path, visited = pending.pop()
+            path = (frame_label(*function),) + path
+            visited |= {function}
+            # (callers already in the stack are recursive calls)
+            callers = {
+                caller: timing
+                for caller, timing in (stats[function][4] if function in stats else {}).items()
+                if caller not in visited
+            }
+            caller_seconds = sum(timing[3] for timing in callers.values())
+            if (
+                not caller_seconds
+                or seconds < self.MIN_STACK_SECONDS
+                or len(path) >= self.MAX_STACK_DEPTH
+            ):
+                stacks[";".join(path)] += round(seconds * 1e6)
+                continue
+            for caller, timing in callers.items():
+                pending.append((caller, seconds * timing[3] / caller_seconds, path, visited))
+        return +stacks  # drop stacks rounded to 0
+
+    def report(self, rows: int = REPORT_ROWS) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(rows)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(rows)
+        return stream.getvalue()
+
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+
+class ProfiledRun(controllers.Recorder):
+    """Writes ``profiler``'s report when closed: at exit, or when it stops the process.
+
+    The process is stopped after ``max_ticks`` ticks or ``max_games`` games (if given).
+    """
+
+    # after the other tick hooks, so that the last tick is processed completely
+    tick_priority = -controllers.RECORDER_PRIORITY
+
+    def __init__(
+        self,
+        profiler: DeterministicProfiler | SamplingProfiler,
+        output_prefix: Path | str,
+        max_ticks: int | None = None,
+        max_games: int | None = None,
+    ) -> None:
+        self.profiler: DeterministicProfiler | SamplingProfiler | None = profiler
+        self.output_prefix = Path(output_prefix)
+        self.max_ticks = max_ticks
+        self.max_games = max_games
+        self.ticks = 0
+        self.games = 0
+
+    def close(self) -> None:
+        """Stop profiling and write the report and collapsed stacks (only the first time)."""
+        if self.profiler is None:
+            return
+        profiler, self.profiler = self.profiler, None
+        profiler.disable()
+        prefix = self.output_prefix
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        report_path = prefix.with_name(prefix.name + ".txt")
+        report_path.write_text(profiler.report())
+        with prefix.with_name(prefix.name + ".folded").open("w") as f:
+            for stack, weight in sorted(profiler.collapsed_stacks().items()):
+                f.write(f"{stack} {weight}\n")
+        print(f"Profile written to {report_path} (and .folded)", file=sys.stderr)
+
+    def on_tick(self, controller: controllers.Controller, *args: Any) -> None:
+        self.ticks += 1
+        if self.max_ticks is not None and self.ticks >= self.max_ticks:
+            print(f"Stopping after {self.ticks} ticks", file=sys.stderr)
+            self.close()
+            raise SystemExit(0)
+
+    def on_game_over(self, controller: controllers.Controller) -> None:
+        self.games += 1
+        if self.max_games is not None and self.games >= self.max_games:
+            print(f"Stopping after {self.games} games", file=sys.stderr)
+            self.close()
+            raise SystemExit(0)
+
+
+def install(
+    mode: str,
+    output_prefix: Path | str,
+    ticks: int | None = None,
+    games: int | None = None,
+    interval: float = 0.001,
+) -> DeterministicProfiler | SamplingProfiler:
+    """Start profiling, stopping the process after ``ticks`` ticks or ``games`` games (if given).
+
+    The report and collapsed stacks are written to ``output_prefix`` + ".txt" and ".folded".
+    """
+    if mode not in PROFILE_MODES:
+        raise Exception(f"Unknown profile {mode=} (expected one of {PROFILE_MODES})")
+    profiler: DeterministicProfiler | SamplingProfiler = (
+        SamplingProfiler(interval) if mode == "sampling" else DeterministicProfiler()
+    )
+    controllers.install_recorder(ProfiledRun(profiler, output_prefix, ticks, games))
+    profiler.enable()
+    return profiler
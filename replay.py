@@ -0,0 +1,200 @@
+"""Compact binary replays of recorded games.
+
+A game is deterministic given its initial state and the sequence of actions taken, except for
+the food that spawns whenever the snake eats. So, rather than storing a snapshot of every state,
+a replay stores a small header followed by one packed byte per action (plus the coordinates of
+any food spawned on that tick).
+
+Header layout (little-endian):
+
+    magic (4s) | version (B) | grid_width (H) | grid_height (H) | score (I) | ticks (I)
+    seed length (H) | seed (utf-8 bytes)
+    number of snake segments (H) | segments (hh each)
+    number of food (H) | food (hh each)
+
+Action byte layout:
+
+    bits 0-1: index of the direction moved (see ``DIRECTIONS``)
+    bit 2: set iff food spawned on this tick, in which case the byte is followed by the number of
+           food spawned (B) and their coordinates (hh each)
+"""
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from game import Game
+from snake import Snake
+from utils import Coordinate, Direction
+
+MAGIC = b"SNKR"
+VERSION = 1
+DIRECTIONS = (Direction.LEFT, Direction.RIGHT, Direction.UP, Direction.DOWN)
+DIRECTION_INDEX = {direction: index for index, direction in enumerate(DIRECTIONS)}
+DIRECTION_MASK = 0b011
+FOOD_SPAWNED_FLAG = 0b100
+
+_HEADER = struct.Struct("<4sBHHII")
+_COUNT = struct.Struct("<H")
+_SPAWN_COUNT = struct.Struct("<B")
+_COORDINATE = struct.Struct("<hh")
+
+
+def _pack_coordinates(coordinates: tuple[Coordinate, ...] | frozenset[Coordinate]) -> bytes:
+    return b"".join(_COORDINATE.pack(*coordinate) for coordinate in coordinates)
+
+
+def _read_exactly(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise Exception(f"Truncated replay: expected {size} bytes but got {len(data)}")
+    return data
+
+
+def _read_coordinates(stream: BinaryIO, count: int) -> list[Coordinate]:
+    data = _read_exactly(stream, count * _COORDINATE.size)
+    return [Coordinate(*xy) for xy in _COORDINATE.iter_unpack(data)]
+
+
+def encode_header(game: Game, seed: str | None = None) -> bytes:
+    """Return the replay header describing the initial ``game`` state."""
+    encoded_seed = (seed or "").encode()
+    return b"".join(
+        (
+            _HEADER.pack(MAGIC, VERSION, game.grid_width, game.grid_height, game.score, game.ticks),
+            _COUNT.pack(len(encoded_seed)),
+            encoded_seed,
+            _COUNT.pack(len(game.snake.segments)),
+            _pack_coordinates(game.snake.segments),
+            _COUNT.pack(len(game.food)),
+            _pack_coordinates(tuple(sorted(game.food))),
+        )
+    )
+
+
+def encode_action(direction: Direction, spawned_food: frozenset[Coordinate] = frozenset()) -> bytes:
+    """Return the packed representation of a single tick."""
+    packed = DIRECTION_INDEX[direction]
+    if not spawned_food:
+        return bytes((packed,))
+    return b"".join(
+        (
+            bytes((packed | FOOD_SPAWNED_FLAG,)),
+            _SPAWN_COUNT.pack(len(spawned_food)),
+            _pack_coordinates(tuple(sorted(spawned_food))),
+        )
+    )
+
+
+class ReplayWriter:
+    """Incrementally records a game to a replay file.
+
+    Call ``record`` with every successive state of the game (i.e., once per tick).
+    """
+
+    def __init__(self, path: Path, game: Game, seed: str | None = None) -> None:
+        self.path = path
+        self.previous = game
+        self.file: BinaryIO = path.open("wb")
+        self.file.write(encode_header(game, seed=seed))
+
+    def record(self, game: Game) -> None:
+        """Append the transition from the previously recorded state to ``game``.
+
+        Recording the same tick more than once is a no-op.
+        """
+        if game.ticks == self.previous.ticks:
+            return
+        spawned_food = game.food - self.previous.food
+        self.file.write(encode_action(game.snake.direction, spawned_food))
+        self.previous = game
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class Replay:
+    """A recorded game that can be reconstructed at any tick.
+
+    Use ``Replay.load`` to read a replay file and ``state_at`` (or ``states``) to reconstruct
+    game states by re-applying the recorded actions with ``Game.update``.
+    """
+
+    def __init__(
+        self,
+        initial_state: Game,
+        actions: list[tuple[Direction, frozenset[Coordinate]]],
+        seed: str = "",
+    ) -> None:
+        self.initial_state = initial_state
+        self.actions = actions
+        self.seed = seed
+
+    def __len__(self) -> int:
+        """Return the number of recorded ticks."""
+        return len(self.actions)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "Replay":
+        with Path(path).open("rb") as f:
+            return cls.read(f)
+
+    @classmethod
+    def read(cls, stream: BinaryIO) -> "Replay":
+        magic, version, grid_width, grid_height, score, ticks = _HEADER.unpack(
+            _read_exactly(stream, _HEADER.size)
+        )
+        if magic != MAGIC:
+            raise Exception(f"Not a replay file: {magic=}")
+        if version != VERSION:
+            raise Exception(f"Unsupported replay {version=} (expected {VERSION})")
+        (seed_length,) = _COUNT.unpack(_read_exactly(stream, _COUNT.size))
+        seed = _read_exactly(stream, seed_length).decode()
+        (segment_count,) = _COUNT.unpack(_read_exactly(stream, _COUNT.size))
+        segments = _read_coordinates(stream, segment_count)
+        (food_count,) = _COUNT.unpack(_read_exactly(stream, _COUNT.size))
+        food = _read_coordinates(stream, food_count)
+        initial_state = Game(
+            grid_width=grid_width,
+            grid_height=grid_height,
+            snake=Snake(segments=tuple(segments)),
+            food=frozenset(food),
+            score=score,
+            ticks=ticks,
+        )
+
+        actions = []
+        while packed := stream.read(1):
+            direction = DIRECTIONS[packed[0] & DIRECTION_MASK]
+            spawned_food: frozenset[Coordinate] = frozenset()
+            if packed[0] & FOOD_SPAWNED_FLAG:
+                (spawn_count,) = _SPAWN_COUNT.unpack(_read_exactly(stream, _SPAWN_COUNT.size))
+                spawned_food = frozenset(_read_coordinates(stream, spawn_count))
+            actions.append((direction, spawned_food))
+        return cls(initial_state=initial_state, actions=actions, seed=seed)
+
+    def states(self) -> Iterator[Game]:
+        """Lazily yield every recorded state, starting with the initial state."""
+        game = self.initial_state
+        yield game
+        for direction, spawned_food in self.actions:
+            game = game.update(direction, spawned_food=spawned_food)
+            yield game
+
+    def state_at(self, tick: int) -> Game:
+        """Return the state of the game after ``tick`` recorded actions."""
+        if not 0 <= tick <= len(self):
+            raise IndexError(f"{tick=} is out of range for a replay of {len(self)} ticks")
+        for recorded_tick, game in enumerate(self.states()):
+            if recorded_tick == tick:
+                return game
+        raise IndexError(tick)  # unreachable: every tick in range is yielded by states()
+
+    @property
+    def final_state(self) -> Game:
+        return self.state_at(len(self))
@@ -1,8 +1,27 @@
 import json
-from typing import Any
+from dataclasses import fields, is_dataclass
+from functools import cache
+from operator import attrgetter
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    TextIO,
+    TypeVar,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
 import yaml
 
+T = TypeVar("T")
+
+# libyaml's C emitter & parser are much faster than the pure Python ones; use them if available
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class SerializerMixin:
     def to_dict(self):
@@ -17,8 +36,72 @@ class SerializerMixin:
     def to_json(self):
         return _to_json(self)
 
+    @classmethod
+    def from_dict(cls: type[T], data: dict[str, Any]) -> T:
+        return _deserialize(cls, data)
+
+    @classmethod
+    def from_yaml(cls: type[T], text: str) -> T:
+        return _deserialize(cls, yaml.safe_load(text))
+
+    @classmethod
+    def from_yml(cls: type[T], text: str) -> T:
+        return _deserialize(cls, yaml.safe_load(text))
+
+    @classmethod
+    def from_json(cls: type[T], text: str) -> T:
+        return _deserialize(cls, json.loads(text))
+
+
+# Serializers are compiled once per type (see _compile_serializer) and cached here, so the shape
+# of e.g. Game, Snake and Coordinate isn't re-discovered for every object serialized.
+_SERIALIZERS: dict[type, Callable[[Any], Any]] = {}
+_PRIMITIVES = (str, int, float)
+
 
 def _serialize(obj: Any):
+    try:
+        serializer = _SERIALIZERS[type(obj)]
+    except KeyError:
+        serializer = _SERIALIZERS[type(obj)] = _compile_serializer(obj)
+    return serializer(obj)
+
+
+def _compile_serializer(obj: Any) -> Callable[[Any], Any]:
+    """Return a function that serializes ``obj`` (and other objects of the same type).
+
+    The result of the returned function is identical to ``_serialize_uncompiled``.
+    """
+    cls = type(obj)
+    if hasattr(obj, "_asdict"):
+        if not hasattr(cls, "_fields"):
+            return _serialize_uncompiled
+        field_names = cls._fields
+        annotations = getattr(cls, "__annotations__", {})
+        if set(annotations) == set(field_names) and set(annotations.values()) <= set(_PRIMITIVES):
+            # e.g., Coordinate, a tuple of ints, which are serialized as themselves
+            return lambda obj: dict(zip(field_names, obj))
+        return lambda obj: {k: _serialize(v) for k, v in zip(field_names, obj)}
+    if hasattr(obj, "__slots__") and hasattr(obj, "__getstate__"):
+        # dataclasses' __getstate__ returns the value of each field (in the same order as slots)
+        if is_dataclass(cls) and tuple(f.name for f in fields(cls)) == tuple(cls.__slots__):
+            getters = tuple((name, attrgetter(name)) for name in cls.__slots__)
+            return lambda obj: {name: _serialize(get(obj)) for name, get in getters}
+        return _serialize_uncompiled
+    elif hasattr(obj, "__dict__"):
+        return _serialize_uncompiled
+    match obj:
+        case dict():
+            return lambda obj: dict(sorted((k, _serialize(v)) for k, v in obj.items()))
+        case (list() | set() | frozenset() | tuple()):
+            return lambda obj: [_serialize(v) for v in obj]
+        case (str() | int() | float()):
+            return lambda obj: obj
+    return lambda obj: None
+
+
+def _serialize_uncompiled(obj: Any):
+    """Serialize ``obj`` by inspecting it at every level (slow, but works for any object)."""
     if hasattr(obj, "_asdict"):
         return {k: _serialize(v) for k, v in obj._asdict().items()}
     if hasattr(obj, "__slots__") and hasattr(obj, "__getstate__"):
@@ -35,6 +118,38 @@ def _serialize(obj: Any):
                 return obj
 
 
+@cache
+def _type_hints(cls: type) -> dict[str, Any]:
+    return get_type_hints(cls)
+
+
+def _deserialize(type_: Any, data: Any) -> Any:
+    """Rebuild an object of type ``type_`` from the output of ``_serialize``.
+
+    Supports (nested) dataclasses, NamedTuples and tuple/list/set/frozenset type annotations.
+    """
+    origin = get_origin(type_)
+    if origin in (tuple, list, set, frozenset):
+        # e.g., tuple[Coordinate, ...] or frozenset[Coordinate]
+        item_type = next(iter(get_args(type_)), Any)
+        return origin(_deserialize(item_type, item) for item in data)
+    if not isinstance(type_, type) or data is None:
+        return data
+    if hasattr(type_, "_fields"):
+        hints = _type_hints(type_)
+        return type_(**{k: _deserialize(hints.get(k, Any), v) for k, v in data.items()})
+    if is_dataclass(type_):
+        hints = _type_hints(type_)
+        return type_(
+            **{
+                field.name: _deserialize(hints[field.name], data[field.name])
+                for field in fields(type_)
+                if field.init and field.name in data
+            }
+        )
+    return data
+
+
 def _to_dict(obj: Any):
     return _serialize(obj)
 
@@ -44,4 +159,51 @@ def _to_json(obj: Any):
 
 
 def _to_yaml(obj: Any):
-    return yaml.dump(_serialize(obj), sort_keys=True)
+    return yaml.dump(_serialize(obj), Dumper=YamlDumper, sort_keys=True)
+
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+
+class StreamWriter:
+    """Appends objects to a file as a stream of documents, one document per object.
+
+    The format is chosen by file extension: JSON Lines for .jsonl/.ndjson files, otherwise
+    multi-document YAML (each document starts with ``---``). Use ``read_stream`` to read them back.
+    """
+
+    def __init__(self, path: Path | str, mode: str = "a") -> None:
+        self.path = Path(path)
+        self.jsonl = self.path.suffix in JSONL_SUFFIXES
+        self.file: TextIO = self.path.open(mode)
+
+    def write(self, obj: Any) -> None:
+        data = _serialize(obj)
+        if self.jsonl:
+            self.file.write(json.dumps(data, sort_keys=True) + "\n")
+        else:
+            yaml.dump(data, self.file, Dumper=YamlDumper, sort_keys=True, explicit_start=True)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "StreamWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def read_stream(path: Path | str, type_: Any = None) -> Iterator[Any]:
+    """Lazily yield each document written to ``path`` by a ``StreamWriter``.
+
+    If ``type_`` is given (e.g., ``Game``), documents are deserialized to that type.
+    """
+    path = Path(path)
+    with path.open() as f:
+        if path.suffix in JSONL_SUFFIXES:
+            documents: Iterator[Any] = (json.loads(line) for line in f if line.strip())
+        else:
+            documents = yaml.load_all(f, Loader=YamlLoader)
+        for document in documents:
+            yield document if type_ is None else _deserialize(type_, document)
@@ -5,11 +5,17 @@ Made with PyGame
 """
 
 import logging
+import struct
 from dataclasses import dataclass
+from itertools import chain
+from typing import Mapping
 
 from serializers import SerializerMixin
 from utils import Coordinate, Direction
 
+# number of segments, followed by an (X, Y) pair of int16s for each segment
+_SEGMENT_COUNT = struct.Struct("<H")
+
 
 @dataclass(frozen=True, eq=True, order=True, kw_only=True, slots=True)
 class Snake(SerializerMixin):
@@ -75,23 +81,49 @@ class Snake(SerializerMixin):
                 f"Attempted to access snake.neck, but the snake is too short! {self.segments=}"
             )
 
-    def move(self, direction: Direction | None, grow: bool) -> "Snake":
+    def move(
+        self,
+        direction: Direction | None,
+        grow: bool,
+        neighbors: Mapping[Coordinate, Mapping[Direction, Coordinate]] | None = None,
+    ) -> "Snake":
+        """Return the snake after moving one cell in ``direction``.
+
+        The new head is looked up in ``neighbors`` (see ``utils.CoordinateTable``), if given and
+        the head is there, rather than created.
+        """
         if direction is None:
             direction = self.direction
         if direction not in self.valid_actions:
             raise Exception(f"Invalid movement direction {direction=}")
-        new_x, new_y = self.head
-        match direction:
-            case Direction.UP:
-                new_y -= 1
-            case Direction.DOWN:
-                new_y += 1
-            case Direction.LEFT:
-                new_x -= 1
-            case Direction.RIGHT:
-                new_x += 1
 
         logging.debug(f"Snake moved: {grow=} {self.head=}")
-        new_head = Coordinate(X=new_x, Y=new_y)
+        head_neighbors = neighbors.get(self.head) if neighbors is not None else None
+        if head_neighbors is not None:
+            new_head = head_neighbors[direction]
+        else:
+            new_x, new_y = self.head
+            match direction:
+                case Direction.UP:
+                    new_y -= 1
+                case Direction.DOWN:
+                    new_y += 1
+                case Direction.LEFT:
+                    new_x -= 1
+                case Direction.RIGHT:
+                    new_x += 1
+            new_head = Coordinate(X=new_x, Y=new_y)
         new_body = self.segments[:] if grow else self.segments[:-1]
         return Snake(segments=(new_head,) + new_body)
+
+    def to_bytes(self) -> bytes:
+        """Return a compact binary encoding of the snake (see ``from_bytes``)."""
+        count = len(self.segments)
+        return struct.pack(f"<H{2 * count}h", count, *chain.from_iterable(self.segments))
+
+    @classmethod
+    def from_bytes(cls, data: bytes | memoryview) -> "Snake":
+        """Return the snake encoded by ``to_bytes``."""
+        (count,) = _SEGMENT_COUNT.unpack_from(data)
+        xys = struct.unpack_from(f"<{2 * count}h", data, _SEGMENT_COUNT.size)
+        return cls(segments=tuple(map(Coordinate, xys[::2], xys[1::2])))
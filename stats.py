@@ -1,9 +1,19 @@
+import atexit
 import csv
+import os
+import time
+from collections import deque
+from itertools import islice
 from pathlib import Path
+from typing import NamedTuple, TextIO
 
 from rich.table import Table
 
-from game import Game
+from game import AsciiRenderer, Game
+from replay import ReplayWriter
+from serializers import StreamWriter
+from streaming_stats import Histogram, MetricSummary
+from tracing import traced
 from utils import get_timestamped_file_path
 
 GAME_STATS_DIR = Path(__file__).parent / "game-stats"
@@ -15,26 +25,135 @@ for p in GAME_STATS_DIR.iterdir():
         p.unlink()
 
 
-class GameStats:
-    """Utility singleton to help track & display historical stats across games."""
+def histogram_text(histogram: Histogram) -> str:
+    """Return the histogram's sparkline, followed by the count of values above its range."""
+    text = histogram.sparkline()
+    if histogram.overflow:
+        text += f" +{histogram.overflow} ≥{histogram.upper:g}"
+    return text
+
+
+class GameSummary(NamedTuple):
+    """Compact record of a single game's statistics."""
+
+    game_number: int
+    ticks: int
+    score: int
 
-    full_history: list[Game] = []
-    _games: list[Game] = []
-    AUTO_SAVE = countdown = 100
+
+class GameStats:
+    """Utility singleton to help track & display historical stats across games.
+
+    Memory use is bounded: only the last ``HISTORY_WINDOW`` states of the current game and the
+    last ``SUMMARY_WINDOW`` game summaries are kept in memory. Every state is saved to the
+    game-history files by ``save_latest``, and every game's summary is appended to
+    ``GAME_STATS_FILE_PATH`` exactly once, when the game ends (see ``finish_game``).
+    """
+
+    HISTORY_WINDOW = 1000
+    SUMMARY_WINDOW = 1000
+    # summary rows are flushed as they're written but only fsync'd every FSYNC_EVERY games
+    FSYNC_EVERY = 10
+    full_history: deque[Game] = deque(maxlen=HISTORY_WINDOW)
+    _games: deque[GameSummary] = deque(maxlen=SUMMARY_WINDOW)
+    games_played = 0
+    games_exported = 0
+    # every state is appended to the game-history files, as YAML documents or JSON lines (.jsonl)
+    HISTORY_FORMAT = ".yml"
+    _replay: ReplayWriter | None = None
+    _history_writer: StreamWriter | None = None
+    _ascii_file: TextIO | None = None
+    _ascii_renderer = AsciiRenderer()
+    _csv_file: TextIO | None = None
+    # when the first game started (games/s is the rate of finished games since then)
+    _run_started_at: float | None = None
+    # summarize every finished game in constant memory
+    summaries = {
+        "score": MetricSummary("score", histogram=Histogram(lower=0, upper=100, buckets=20)),
+        "ticks": MetricSummary("ticks", histogram=Histogram(lower=0, upper=10_000, buckets=20)),
+        "food/tick": MetricSummary("food/tick"),
+    }
 
     @classmethod
     def update_game(cls, game: Game) -> None:
         """Update the statistics for the most recently tracked game."""
-        cls._games[-1] = game
+        if cls.full_history and cls.full_history[-1] is game:
+            return  # already tracked (e.g., by an on_tick hook before an on_game_over hook)
+        cls._games[-1] = cls._games[-1]._replace(ticks=game.ticks, score=game.score)
         cls.full_history.append(game)
+        cls.save_latest()
+        if cls._replay:
+            cls._replay.record(game)
 
     @classmethod
-    def new_game(cls, game: Game) -> None:
+    @traced("GameStats.new_game", "stats")
+    def new_game(cls, game: Game, seed: str | None = None) -> None:
         """Start tracking statistics for a new game."""
-        if cls.full_history:
-            cls.save_latest()
-        cls._games.append(game)
-        cls.full_history = [game]
+        cls._close_history_files()
+        cls.finish_game()
+        cls.games_played += 1
+        if cls._run_started_at is None:
+            cls._run_started_at = time.perf_counter()
+        cls._games.append(GameSummary(cls.games_played, game.ticks, game.score))
+        cls.full_history.clear()
+        cls.full_history.append(game)
+        cls._open_history_files(game, seed=seed)
+
+    @classmethod
+    def _open_history_files(cls, game: Game, seed: str | None) -> None:
+        file_name = f"game-history.{cls.games_played}"
+        cls._replay = ReplayWriter(GAME_STATS_DIR / f"{file_name}.snkr", game, seed=seed)
+        cls._history_writer = StreamWriter(GAME_STATS_DIR / f"{file_name}{cls.HISTORY_FORMAT}")
+        cls._ascii_file = (GAME_STATS_DIR / f"{file_name}.txt").open("a")
+
+    @classmethod
+    def _close_history_files(cls) -> None:
+        for f in (cls._replay, cls._history_writer, cls._ascii_file):
+            if f is not None:
+                f.close()
+        cls._replay = cls._history_writer = cls._ascii_file = None
+
+    @classmethod
+    @traced("GameStats.finish_game", "stats")
+    def finish_game(cls, game: Game | None = None) -> None:
+        """Append the most recent game's summary to the summary CSV file.
+
+        If ``game`` is given, its ticks and score are used as the most recent game's final stats.
+        Each game is exported at most once, so calling this repeatedly is safe.
+        """
+        if game is not None:
+            cls._games[-1] = cls._games[-1]._replace(ticks=game.ticks, score=game.score)
+        if cls.games_exported == cls.games_played:
+            return
+        cls.games_exported = cls.games_played
+        if cls._csv_file is None:
+            cls._csv_file = GAME_STATS_FILE_PATH.open("a", newline="")
+            atexit.register(cls.close)
+        csv.writer(cls._csv_file).writerow(cls._games[-1])
+        cls._csv_file.flush()
+        if cls.games_exported % cls.FSYNC_EVERY == 0:
+            os.fsync(cls._csv_file.fileno())
+        cls._update_summaries(cls._games[-1])
+
+    @classmethod
+    def _update_summaries(cls, summary: GameSummary) -> None:
+        """Add a finished game to the streaming summaries."""
+        cls.summaries["score"].add(summary.score)
+        cls.summaries["ticks"].add(summary.ticks)
+        cls.summaries["food/tick"].add(summary.score / summary.ticks if summary.ticks else 0.0)
+
+    @classmethod
+    @traced("GameStats.close", "stats")
+    def close(cls) -> None:
+        """Export the current game (if not already exported) and close all open files."""
+        if cls.games_played:
+            cls.finish_game()
+        cls._close_history_files()
+        if cls._csv_file is not None:
+            cls._csv_file.flush()
+            os.fsync(cls._csv_file.fileno())
+            cls._csv_file.close()
+            cls._csv_file = None
 
     headers = ("game #", "tick #", "score")
 
@@ -43,19 +162,11 @@ class GameStats:
         """Return rows of game stats.
 
         Use colors=False for machine-parseable format, True for terminal display.
-        Use count=0 to return all rows of historical data.
+        Use count=0 to return all rows of historical data still held in memory.
         """
         # reversed to put most recent at top of table
-        _rows = [
-            [
-                str(game_number),
-                str(game.ticks),
-                str(game.score),
-            ]
-            for game_number, game in reversed(
-                list(enumerate(cls._games[-count:], start=max(0, (len(cls._games) - count)) + 1))
-            )
-        ]
+        recent_games = islice(reversed(cls._games), count or None)
+        _rows = [[str(field) for field in summary] for summary in recent_games]
 
         if colors:
             SCORE_COLUMN = 2
@@ -67,10 +178,6 @@ class GameStats:
     @classmethod
     def live_display(cls) -> Table:
         """Return game stats in a rich.table.Table"""
-        cls.countdown = (cls.countdown - 1) % cls.AUTO_SAVE
-        cls.save_latest()
-        if cls.countdown == 0:
-            cls.to_csv(GAME_STATS_FILE_PATH)
         table = Table()
         for header in cls.headers:
             table.add_column(header)
@@ -80,18 +187,49 @@ class GameStats:
         return table
 
     @classmethod
-    def save_latest(cls):
-        yaml_file_name = f"game-history.{len(cls._games)}.yml"
-        ascii_file_name = f"game-history.{len(cls._games)}.txt"
-        with (GAME_STATS_DIR / ascii_file_name).open("a") as ascii_f, (
-            GAME_STATS_DIR / yaml_file_name
-        ).open("a") as yaml_f:
-            ascii_f.write(cls.full_history[-1].to_ascii() + "\n")
-            yaml_f.write(cls.full_history[-1].to_yml() + "\n")
+    def games_per_second(cls) -> float:
+        """Return the number of games finished per second of wall time since the first started."""
+        if cls._run_started_at is None:
+            return 0.0
+        elapsed = time.perf_counter() - cls._run_started_at
+        return cls.games_exported / elapsed if elapsed > 0 else 0.0
 
     @classmethod
-    def to_csv(cls, filepath: Path) -> None:
-        """Save the game statistics table to a CSV file"""
-        writer = csv.writer(filepath.open("w"))
-        # writer.writerows([cls.headers] + cls.rows(colors=False))
-        writer.writerows(cls.rows(colors=False, count=0))
+    def summary_display(cls) -> Table:
+        """Return streaming summaries of all finished games in a rich.table.Table"""
+        table = Table(
+            "metric", "n", "mean", "stdev", "min", "p50", "p90", "p99", "max", "histogram"
+        )
+        for name, metric in cls.summaries.items():
+            moments = metric.moments
+            if moments.count == 0:
+                table.add_row(name, "0")
+                continue
+            table.add_row(
+                name,
+                str(moments.count),
+                *(
+                    f"{value:.3g}"
+                    for value in (
+                        moments.mean,
+                        moments.stdev,
+                        moments.min,
+                        metric.quantile(0.5),
+                        metric.quantile(0.9),
+                        metric.quantile(0.99),
+                        moments.max,
+                    )
+                ),
+                histogram_text(metric.histogram) if metric.histogram is not None else "",
+            )
+        table.add_row("games/s", str(cls.games_exported), f"{cls.games_per_second():.3g}")
+        return table
+
+    @classmethod
+    @traced("GameStats.save_latest", "stats")
+    def save_latest(cls):
+        """Append the latest state to the game-history files (see ``serializers.read_stream``)."""
+        if cls._history_writer is None or cls._ascii_file is None:
+            return
+        cls._ascii_file.write(cls.full_history[-1].to_ascii(cls._ascii_renderer) + "\n")
+        cls._history_writer.write(cls.full_history[-1])
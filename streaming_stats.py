@@ -0,0 +1,241 @@
+"""Constant-memory, O(1)-update statistics for summarizing very long runs.
+
+None of these classes keep the values they're given, so they can summarize millions of games
+without storing them.
+"""
+import math
+from bisect import bisect_right, insort
+from typing import Iterable
+
+import numpy as np
+
+
+class RunningStats:
+    """Running count, mean, variance, min and max using Welford's algorithm.
+
+    See "Welford's online algorithm" in:
+        https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._sum_of_squared_deltas = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._sum_of_squared_deltas += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def variance(self) -> float:
+        """The sample variance (or nan if fewer than 2 values have been added)."""
+        if self.count < 2:
+            return float("nan")
+        return self._sum_of_squared_deltas / (self.count - 1)
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class P2Quantile:
+    """Estimates a single quantile using the P² algorithm (five markers, no stored samples).
+
+    See: Jain & Chlamtac, "The P² algorithm for dynamic calculation of quantiles and histograms
+    without storing observations" (1985).
+    """
+
+    def __init__(self, quantile: float) -> None:
+        if not 0 < quantile < 1:
+            raise Exception(f"Quantile must be between 0 and 1 (exclusive), got {quantile=}")
+        self.quantile = p = quantile
+        self.heights: list[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired_positions = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, value: float) -> None:
+        heights, positions = self.heights, self.positions
+        if len(heights) < 5:
+            insort(heights, value)
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = bisect_right(heights, value) - 1
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired_positions[i] += self.increments[i]
+
+        # adjust the heights of the three middle markers if they're off their desired positions
+        for i in range(1, 4):
+            offset = self.desired_positions[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (
+                offset <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, step)
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i: int, step: int) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+
+    @property
+    def value(self) -> float:
+        """The current estimate (exact until more than 5 values have been added)."""
+        if not self.heights:
+            return float("nan")
+        if len(self.heights) < 5:
+            return self.heights[round(self.quantile * (len(self.heights) - 1))]
+        return self.heights[2]
+
+
+class Histogram:
+    """Counts of values falling in ``buckets`` equal-width buckets spanning [lower, upper).
+
+    Values outside of the range are counted in ``underflow`` and ``overflow``.
+    """
+
+    BARS = " ▁▂▃▄▅▆▇█"
+
+    def __init__(self, lower: float, upper: float, buckets: int) -> None:
+        if upper <= lower or buckets < 1:
+            raise Exception(f"Invalid histogram range {lower=} {upper=} {buckets=}")
+        self.lower = lower
+        self.upper = upper
+        self.bucket_width = (upper - lower) / buckets
+        self.counts = [0] * buckets
+        self.underflow = 0
+        self.overflow = 0
+
+    def add(self, value: float) -> None:
+        if value < self.lower:
+            self.underflow += 1
+        elif value >= self.upper:
+            self.overflow += 1
+        else:
+            # min() guards against floating point error for values just below ``upper``
+            bucket = min(int((value - self.lower) / self.bucket_width), len(self.counts) - 1)
+            self.counts[bucket] += 1
+
+    @property
+    def edges(self) -> list[float]:
+        """The lower edge of each bucket, followed by the upper edge of the last bucket."""
+        return [self.lower + i * self.bucket_width for i in range(len(self.counts) + 1)]
+
+    def sparkline(self) -> str:
+        """Return one bar per bucket, scaled to the largest count (any nonzero count shows)."""
+        peak = max(self.counts)
+        scale = (len(self.BARS) - 1) / peak if peak else 0
+        return "".join(self.BARS[math.ceil(count * scale)] for count in self.counts)
+
+
+class MetricSummary:
+    """Combines running moments, quantile estimates and (optionally) a histogram of one metric."""
+
+    def __init__(
+        self,
+        name: str,
+        quantiles: Iterable[float] = (0.5, 0.9, 0.99),
+        histogram: Histogram | None = None,
+    ) -> None:
+        self.name = name
+        self.moments = RunningStats()
+        self.quantiles = {q: P2Quantile(q) for q in quantiles}
+        self.histogram = histogram
+
+    def add(self, value: float) -> None:
+        self.moments.add(value)
+        for estimator in self.quantiles.values():
+            estimator.add(value)
+        if self.histogram is not None:
+            self.histogram.add(value)
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles[q].value
+
+
+class LogHistogram:
+    """Counts of non-negative integers (e.g., latencies in ns) in logarithmic buckets.
+
+    Like HdrHistogram, each value is rounded down to ``significant_bits`` significant bits, so
+    quantiles are accurate to within a relative error of 2**(1 - significant_bits) over any range
+    of values, using a few hundred buckets at most. ``min``, ``max`` and ``total`` are exact.
+    """
+
+    def __init__(self, significant_bits: int = 7) -> None:
+        self.significant_bits = significant_bits
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: int | None = None
+        self.max: int | None = None
+
+    def bucket(self, value: int) -> int:
+        """Return the lower bound of the bucket containing ``value``."""
+        shift = max(value.bit_length() - self.significant_bits, 0)
+        return value >> shift << shift
+
+    def add(self, value: int) -> None:
+        bucket = self.bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def add_many(self, values) -> None:
+        """Add a sequence (or array) of values at once, much faster than calling ``add``."""
+        values = np.asarray(values, dtype=np.int64)
+        if not values.size:
+            return
+        # frexp's exponent is the bit length (exact for values below 2**53)
+        _, bit_lengths = np.frexp(values.astype(np.float64))
+        shifts = np.maximum(bit_lengths - self.significant_bits, 0)
+        buckets, counts = np.unique(values >> shifts << shifts, return_counts=True)
+        for bucket, count in zip(buckets.tolist(), counts.tolist()):
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += int(values.size)
+        self.total += int(values.sum())
+        low, high = int(values.min()), int(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def quantile(self, q: float) -> float:
+        """Return the ``q`` quantile (rounded down to its bucket, or nan if nothing was added)."""
+        if not self.count:
+            return float("nan")
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return max(bucket, self.min or 0)
+        return float(self.max or 0)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float("nan")
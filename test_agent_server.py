@@ -0,0 +1,108 @@
+import threading
+from typing import Any
+
+import pytest
+
+from agent_server import (
+    AgentClient,
+    AgentServer,
+    RemoteAgent,
+    decode_reply,
+    parse_address,
+)
+from agents import GentleBrute
+from game import Game
+from utils import Direction
+
+
+class BatchGentleBrute(GentleBrute):
+    def __init__(self) -> None:
+        self.batch_sizes: list[int] = []
+
+    def get_actions(self, states: list[Game]) -> list:
+        self.batch_sizes.append(len(states))
+        return [self.get_action(state) for state in states]
+
+
+class Crasher(GentleBrute):
+    def get_action(self, state: Game):
+        raise Exception("crashed")
+
+
+def serve(tmp_path, agent_class: type, **kwargs) -> AgentServer:
+    server = AgentServer(agent_class, address=str(tmp_path / "agent.sock"), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_remote_agent_plays_like_local_agent(tmp_path) -> None:
+    game = Game(grid_width=8, grid_height=8)
+    server = serve(tmp_path, GentleBrute)
+    client = AgentClient(server.address, agent="GentleBrute")
+    local = GentleBrute()
+    for _ in range(30):
+        actions = client.get_action(game)
+        assert actions == [local.get_action(game)]
+        game = game.update(actions[0])
+    client.close()
+    with pytest.raises(Exception, match="serves GentleBrute"):
+        AgentClient(server.address, agent="TailChaser")
+
+
+def test_concurrent_requests_are_batched(tmp_path, game: Game) -> None:
+    server = serve(tmp_path, BatchGentleBrute, batch_window=0.5)
+    clients = [AgentClient(server.address) for _ in range(4)]
+    replies: list = []
+    threads = [
+        threading.Thread(target=lambda c=client: replies.append(c.get_action(game)))
+        for client in clients
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert replies == [[GentleBrute().get_action(game)]] * 4
+    agent: Any = server.shared_agent
+    assert max(agent.batch_sizes) > 1
+    assert sum(agent.batch_sizes) == 4
+
+
+def test_agent_errors_are_sent_to_the_client(tmp_path, game: Game) -> None:
+    server = serve(tmp_path, Crasher)
+    with pytest.raises(Exception, match="crashed"):
+        AgentClient(server.address).get_action(game)
+
+
+def test_remote_agent_controller(tmp_path, game: Game) -> None:
+    server = serve(tmp_path, GentleBrute)
+    controller = RemoteAgent(address=server.address, game=game)
+    assert isinstance(controller.get_action(events=[]), Direction)
+
+
+def test_parse_address() -> None:
+    assert parse_address("/tmp/agent.sock") == "/tmp/agent.sock"
+    assert parse_address("localhost:6000") == ("localhost", 6000)
+
+
+class ShortBatchGentleBrute(BatchGentleBrute):
+    def get_actions(self, states: list[Game]) -> list:
+        return super().get_actions(states)[1:]
+
+
+def test_undecodable_requests_get_an_error_reply(tmp_path, game: Game) -> None:
+    server = AgentServer(GentleBrute, address=str(tmp_path / "agent.sock"))
+    connection: Any = object()
+    server.agents[connection] = GentleBrute()
+    replies = server.answer([(connection, b"garbage"), (connection, game.to_bytes())])
+    with pytest.raises(Exception, match="The agent server failed"):
+        decode_reply(replies[0])
+    assert decode_reply(replies[1]) == [GentleBrute().get_action(game)]
+
+
+def test_short_batches_of_results_are_errors(tmp_path, game: Game) -> None:
+    server = AgentServer(ShortBatchGentleBrute, address=str(tmp_path / "agent.sock"))
+    connection: Any = None
+    replies = server.answer([(connection, game.to_bytes())] * 2)
+    for reply in replies:
+        with pytest.raises(Exception, match="1 results for 2 states"):
+            decode_reply(reply)
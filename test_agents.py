@@ -1,9 +1,17 @@
+import math
+import random
+
 import pytest
 
 from agents import (
+    Hamiltonian,
+    Portfolio,
+    QSummary,
     a_star,
     feeder_goal,
+    hamiltonian_cycle,
     min_man_heuristic,
+    plan_value,
     reciprocal_average_food_heuristic,
     tail_chaser_goal,
 )
@@ -138,3 +146,107 @@ def test_a_star_food_only_goal(
         )
         == expected_actions
     )
+
+
+def test_q_summary_matches_full_scan() -> None:
+    Q: dict[str, float] = {}
+    summary = QSummary()
+    for key, value in [
+        ("a", 0.0),
+        ("b", 1.5),
+        ("a", -2.0),
+        ("c", float("-inf")),
+        ("d", float("nan")),
+        ("b", 0.0),
+        ("d", 3.0),
+    ]:
+        summary.update(Q.get(key), value)
+        Q[key] = value
+    values = Q.values()
+    assert summary.total == len(values)
+    assert summary.positive == sum(1 for v in values if v > 0)
+    assert summary.zero == sum(1 for v in values if v == 0)
+    assert summary.negative == sum(1 for v in values if v < 0)
+    assert summary.nan == sum(1 for v in values if math.isnan(v))
+    assert summary.negative_infinite == sum(1 for v in values if v == float("-inf"))
+    assert summary.total_sum == sum(v for v in values if v != float("-inf") and not math.isnan(v))
+
+
+def test_plan_value() -> None:
+    game = Game(grid_width=4, grid_height=4, food=frozenset({Coordinate(0, 3)}))
+    # the default snake's head is at (0, 1), moving down
+    assert plan_value(game, [Direction.LEFT]) is None  # off the board
+    assert plan_value(game, [Direction.UP]) is None  # invalid direction
+    eats = plan_value(game, [Direction.DOWN, Direction.DOWN])
+    wanders = plan_value(game, [Direction.RIGHT, Direction.DOWN])
+    assert eats is not None and wanders is not None and eats > wanders
+
+
+def test_portfolio() -> None:
+    game = Game(grid_width=8, grid_height=8, food=frozenset({Coordinate(0, 4)}))
+    portfolio = Portfolio(members=["Hungry"], deadline=10)
+    try:
+        assert portfolio.get_action(game) == [Direction.DOWN] * 3
+        assert portfolio.choices == {"Hungry": 1}
+    finally:
+        portfolio.close()
+    # without waiting for members, it falls back to GentleBrute
+    portfolio = Portfolio(members=["Hungry"], deadline=0)
+    try:
+        assert portfolio.get_action(game) == [Direction.DOWN]
+        assert portfolio.choices == {Portfolio.FALLBACK: 1}
+    finally:
+        portfolio.close()
+    with pytest.raises(Exception, match="Invalid portfolio"):
+        Portfolio(members=["Portfolio"])
+
+
+@pytest.mark.parametrize("grid_width, grid_height", [(2, 2), (4, 3), (3, 4), (12, 8), (9, 10)])
+def test_hamiltonian_cycle(grid_width: int, grid_height: int) -> None:
+    cells = hamiltonian_cycle(grid_width, grid_height).cells
+    assert len(set(cells)) == len(cells) == grid_width * grid_height
+    assert all(manhattan_distance(a, b) == 1 for a, b in zip(cells, cells[1:] + cells[:1]))
+    # the default snake (tail first) is on the cycle
+    assert cells[-1:] + cells[:2] == (Coordinate(1, 0), Coordinate(0, 0), Coordinate(0, 1))
+
+
+def test_hamiltonian_cycle_unsupported() -> None:
+    with pytest.raises(Exception, match="No Hamiltonian cycle"):
+        hamiltonian_cycle(5, 5)
+
+
+def fill_grid(
+    agent: Hamiltonian, grid_width: int, grid_height: int, seed: int = 0, food: int = 2
+) -> int:
+    """Return the number of ticks ``agent`` takes to fill the grid (failing if it dies)."""
+    random.seed(seed)
+    game = Game(
+        grid_width=grid_width,
+        grid_height=grid_height,
+        food=Coordinate.random(grid_width, grid_height, n=food),
+    )
+    while len(game.snake.segments) < grid_width * grid_height:
+        game = game.update(agent.get_action(game))
+        assert not game.game_over, f"died at length {len(game.snake.segments)}"
+    return game.ticks
+
+
+@pytest.mark.parametrize("grid_width, grid_height", [(6, 4), (5, 6), (12, 8)])
+def test_hamiltonian_fills_the_grid(grid_width: int, grid_height: int) -> None:
+    shortcuts = fill_grid(Hamiltonian(), grid_width, grid_height)
+    # a margin as large as the grid rules out shortcuts
+    cycle_only = fill_grid(Hamiltonian(margin=grid_width * grid_height), grid_width, grid_height)
+    assert shortcuts < cycle_only
+
+
+@pytest.mark.parametrize("food", [3, 4, 5])
+@pytest.mark.parametrize(
+    "grid_width, grid_height, seeds",
+    # including seeds on which shortcuts once left too little room for the food eaten after them
+    [(12, 8, (0, 10, 13, 26)), (16, 12, (3,)), (6, 4, (2, 5))],
+)
+def test_hamiltonian_fills_the_grid_with_more_food(
+    grid_width: int, grid_height: int, seeds: tuple[int, ...], food: int
+) -> None:
+    for seed in seeds:
+        fill_grid(Hamiltonian(), grid_width, grid_height, seed=seed, food=food)
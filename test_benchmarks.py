@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks import BENCHMARKS, compare, serpentine_game
+
+
+@pytest.mark.parametrize("name", BENCHMARKS)
+def test_benchmark_runs(name: str) -> None:
+    BENCHMARKS[name]()()
+
+
+def test_serpentine_game() -> None:
+    game = serpentine_game(5, 4, length=12)
+    assert game.snake.validate_segments()
+    assert len(game.snake.segments) == 12
+    assert not game.game_over
+
+
+def test_compare() -> None:
+    assert compare({"a": 1.3, "b": 1.1, "c": 1.0}, {"a": 1.0, "b": 1.0}, threshold=0.2) == ["a"]
@@ -0,0 +1,188 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable
+
+import pygame
+import pytest
+
+import controllers
+import tracing
+from agents import GentleBrute
+from controllers import AsyncAgent, Hook, hook_name, register
+from game import Game
+from timings import PhaseTimings
+
+
+@pytest.fixture
+def pygame_display(monkeypatch):
+    """Initialize pygame's display (for pygame.event.get) without opening a window."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    yield
+    pygame.display.quit()
+
+
+def test_register_orders_by_priority() -> None:
+    def a(*args) -> None:
+        ...
+
+    def b(*args) -> None:
+        ...
+
+    def c(*args) -> None:
+        ...
+
+    hooks: list = []
+    register(hooks, a)
+    last = register(hooks, b, priority=-1)
+    first = register(hooks, c, priority=1)
+    register(hooks, a)
+    assert hooks == [first, a, a, last]
+    assert isinstance(first, Hook) and first.function is c
+
+
+def test_every_n_ticks() -> None:
+    calls: list[int] = []
+    hook = Hook(calls.append, every_n_ticks=3)
+    for tick in range(10):
+        hook(tick)
+    assert calls == [0, 3, 6, 9]
+
+
+def test_every_seconds() -> None:
+    calls: list[int] = []
+    hook = Hook(calls.append, every_seconds=3600)
+    for tick in range(10):
+        hook(tick)
+    assert calls == [0]
+
+
+def test_threaded() -> None:
+    calls: list[int] = []
+    hook = Hook(calls.append, threaded=True)
+    hook(1)
+    hook.join()
+    assert calls == [1]
+
+
+class SlowGentleBrute(GentleBrute):
+    # set when planning starts for the state after the given number of ticks
+    planning: defaultdict[int, threading.Event] = defaultdict(threading.Event)
+
+    def get_action(self, state: Game):
+        self.planning[state.ticks].set()
+        time.sleep(0.02)
+        return super().get_action(state)
+
+
+def play(
+    controller_class: Callable[..., controllers.Agent], ticks: int, monkeypatch, *hooks
+) -> list:
+    """Return the actions taken in the first ``ticks`` ticks of a game, calling ``hooks``."""
+
+    def stop_after_ticks(controller: controllers.Controller, live) -> None:
+        if controller.game.ticks >= ticks:
+            raise controllers.Stop
+
+    monkeypatch.setattr(controllers, "on_new_game", [])
+    monkeypatch.setattr(controllers, "on_tick", [*hooks, stop_after_ticks])
+    monkeypatch.setattr(SlowGentleBrute, "planning", defaultdict(threading.Event))
+    random.seed("controllers")
+    game = Game(grid_width=6, grid_height=4)
+    controller = controller_class(agent_class=SlowGentleBrute, game=game)
+    with pytest.raises(controllers.Stop):
+        controller.game_loop()
+    return controller.action_history
+
+
+def test_async_agent_plays_like_agent(monkeypatch, pygame_display) -> None:
+    assert play(AsyncAgent, 20, monkeypatch) == play(controllers.Agent, 20, monkeypatch)
+
+
+def test_async_agent_plans_while_hooks_run(monkeypatch, pygame_display) -> None:
+    def render(controller: controllers.Controller, live) -> None:
+        # (a plain Agent only plans for this state after the hooks, so this would time out)
+        assert SlowGentleBrute.planning[controller.game.ticks].wait(timeout=2)
+
+    play(AsyncAgent, 20, monkeypatch, render)
+
+
+@pytest.mark.parametrize("controller_class", [controllers.Agent, AsyncAgent])
+def test_game_loop_times_phases(monkeypatch, pygame_display, controller_class) -> None:
+    def render(controller: controllers.Controller, live) -> None:
+        ...
+
+    timings = PhaseTimings()
+    monkeypatch.setattr(controllers, "TIMINGS", timings)
+    play(controller_class, 5, monkeypatch, render)
+    # the last tick is stopped by a hook, before waiting for the next frame
+    assert {name: len(durations) for name, durations in timings.pending.items()} == {
+        "events": 5,
+        "agent": 5,
+        "simulation": 5,
+        "hook:render": 5,
+        "hook:stop_after_ticks": 5,
+        "clock": 4,
+    }
+
+
+def test_game_loop_traces_ticks(monkeypatch, pygame_display) -> None:
+    tracer = tracing.Tracer()
+    monkeypatch.setattr(tracing, "TRACER", tracer)
+    play(controllers.Agent, 3, monkeypatch)
+    names = [name for name, *_ in tracer.events]
+    assert names.count("tick") == 2 and names.count("stop_after_ticks") == 3
+    ticks = [event for event in tracer.events if event[0] == "tick"]
+    assert [args for *_, args in ticks] == [{"tick": 1}, {"tick": 2}]
+
+
+def test_install_recorder_registers_overridden_hooks(monkeypatch) -> None:
+    class TickCounter(controllers.Recorder):
+        ticks = 0
+
+        def on_tick(self, controller, live) -> None:
+            self.ticks += 1
+
+    closers: list = []
+    monkeypatch.setattr(controllers, "on_tick", [Hook(print, priority=-1)])
+    monkeypatch.setattr(controllers, "on_new_game", [])
+    monkeypatch.setattr(controllers, "on_game_over", [])
+    monkeypatch.setattr(controllers.atexit, "register", closers.append)
+    recorder = controllers.install_recorder(TickCounter())
+    assert [hook_name(hook) for hook in controllers.on_tick] == ["TickCounter.on_tick", "print"]
+    first: Any = controllers.on_tick[0]
+    assert first.priority == controllers.RECORDER_PRIORITY
+    assert controllers.on_new_game == controllers.on_game_over == []
+    assert closers == [recorder.close]
+
+
+def test_run_closes_the_agent(monkeypatch, pygame_display) -> None:
+    class ClosingGentleBrute(GentleBrute):
+        closed = False
+
+        def close(self) -> None:
+            self.closed = True
+
+    def stop(controller: controllers.Controller, live) -> None:
+        raise controllers.Stop
+
+    monkeypatch.setattr(controllers, "on_new_game", [])
+    monkeypatch.setattr(controllers, "on_tick", [stop])
+    monkeypatch.setattr(controllers, "on_game_over", [])
+    controller = controllers.Agent(
+        agent_class=ClosingGentleBrute, game=Game(grid_width=6, grid_height=4)
+    )
+    with pytest.raises(SystemExit):
+        controller.run()
+    agent: Any = controller.agent_instance
+    assert agent.closed
+
+
+def test_async_agent_close_shuts_down_the_planner(game: Game) -> None:
+    controller = AsyncAgent(agent_class=GentleBrute, game=game)
+    controller.executor.submit(time.sleep, 0)
+    controller.close()
+    with pytest.raises(RuntimeError, match="shutdown"):
+        controller.executor.submit(time.sleep, 0)
@@ -0,0 +1,14 @@
+from dashboard import Dashboard
+
+
+def test_hooks_follow_refresh_rate() -> None:
+    calls: list[int] = []
+    dashboard = Dashboard(refresh_rate=0.001)
+    hook = dashboard.hook(calls.append)
+    for tick in range(3):
+        hook(tick)
+    assert calls == [0]  # the next call is due in 1000s
+    dashboard.refresh_rate = 0  # no limit
+    for tick in range(3, 6):
+        hook(tick)
+    assert calls == [0, 3, 4, 5]
@@ -1,6 +1,7 @@
+import random
 from dataclasses import replace
 
-from game import Game
+from game import AsciiRenderer, Game, cell_changes
 from snake import Snake
 
 
@@ -51,3 +52,46 @@ def test_equality(game: Game) -> None:
     assert game_copy == game
     game_copy = replace(game_copy, snake=Snake(segments=game.snake.segments))
     assert game_copy == game
+
+
+def test_bytes_round_trip(game: Game) -> None:
+    game = replace(game, score=7, ticks=123)
+    restored = Game.from_bytes(game.to_bytes())
+    assert restored == game
+    assert restored.ticks == game.ticks
+    assert restored.snake.segments == game.snake.segments
+
+
+def test_text_round_trip(game: Game) -> None:
+    assert Game.from_dict(game.to_dict()) == game
+    assert Game.from_json(game.to_json()) == game
+    assert Game.from_yaml(game.to_yaml()) == game
+    assert Snake.from_json(game.snake.to_json()) == game.snake
+
+
+def test_incremental_ascii_rendering(game: Game) -> None:
+    """AsciiRenderer must render exactly what a full redraw would."""
+    renderer = AsciiRenderer()
+    random.seed("ascii")
+    state = replace(game, grid_width=6, grid_height=4)
+    for _ in range(200):
+        assert renderer.render(state) == state._to_ascii_full()
+        if state.game_over:
+            state = replace(game, grid_width=6, grid_height=4)
+        else:
+            state = random.choice(state.successors)
+    # and states that don't follow the previously rendered state
+    assert renderer.render(game) == game._to_ascii_full()
+    assert game.to_ascii() == game.to_ascii(renderer) == game._to_ascii_full()
+
+
+def test_cell_changes(game: Game) -> None:
+    state = replace(game, grid_width=6, grid_height=4)
+    following = state.successors[0]
+    assert cell_changes(state, following) is not None
+    assert cell_changes(state, state) is None
+    assert cell_changes(state, following.successors[0]) is None
+    head, *body = following.snake.segments
+    assert body, "needs a snake with a neck"
+    jumped = replace(following.snake, segments=(head,) * (len(body) + 1))
+    assert cell_changes(state, replace(following, snake=jumped)) is None
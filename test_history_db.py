@@ -0,0 +1,26 @@
+from game import Game
+from history_db import HistoryStore
+
+
+def test_record_and_query(tmp_path, game: Game) -> None:
+    store = HistoryStore(tmp_path / "history.sqlite", batch_size=2)
+    states = [game]
+    for _ in range(3):
+        states.append(states[-1].update())
+    store.record_game("run", 1, "Spinner", "seed", game)
+    for state in states[1:]:
+        store.record_tick("run", 1, state)
+    store.record_game("run", 1, "Spinner", "seed", states[-1])
+    store.record_game("other run", 1, "Hungry", None, game)
+    store.flush()
+
+    games = store.games(agent="Spinner")
+    assert list(games["run_id"]) == ["run"]
+    assert list(games["ticks"]) == [3]
+
+    ticks = store.ticks(run_id="run", game_number=1)
+    assert list(ticks["tick"]) == [1, 2, 3]
+    assert list(ticks["head_x"]) == [s.snake.head.X for s in states[1:]]
+    assert list(ticks["head_y"]) == [s.snake.head.Y for s in states[1:]]
+    assert store.ticks(run_id="other run")["tick"].size == 0
+    store.close()
@@ -0,0 +1,29 @@
+import sys
+
+from agents import SearchStats
+from game import Game
+from memory import deep_sizeof, format_bytes
+
+
+def test_deep_sizeof_counts_shared_objects_once(game: Game) -> None:
+    size = deep_sizeof(game)
+    assert size > sys.getsizeof(game) + sys.getsizeof(game.snake) + sys.getsizeof(game.food)
+    assert deep_sizeof([game, game]) == sys.getsizeof([game, game]) + size
+    successors = game.successors
+    assert deep_sizeof(successors) < sum(deep_sizeof(s) for s in successors)  # shared food
+
+
+def test_search_stats() -> None:
+    search_stats = SearchStats()
+    search_stats.record(peak_frontier=10, closed=3)
+    search_stats.record(peak_frontier=4, closed=5)
+    assert search_stats == SearchStats(
+        searches=2, latest_frontier=4, latest_closed=5, peak_frontier=10, peak_closed=5
+    )
+
+
+def test_format_bytes() -> None:
+    assert format_bytes(1023) == "1023B"
+    assert format_bytes(1536) == "1.5KiB"
+    assert format_bytes(-3 * 2**20, signed=True) == "-3.0MiB"
+    assert format_bytes(2**20, signed=True) == "+1.0MiB"
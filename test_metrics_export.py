@@ -0,0 +1,23 @@
+import numpy as np
+
+from game import Game
+from metrics_export import TickMetricsRecorder
+
+
+def test_save_and_load(tmp_path, game: Game) -> None:
+    recorder = TickMetricsRecorder()
+    states = [game]
+    for _ in range(3):
+        states.append(states[-1].update())
+    for think_time_ns, state in enumerate(states[1:]):
+        recorder.record(1, state, think_time_ns=think_time_ns)
+    assert len(recorder) == 3
+
+    path = tmp_path / "metrics.npz"
+    recorder.save(path)
+    metrics = np.load(path)
+    assert list(metrics["game"]) == [1, 1, 1]
+    assert list(metrics["tick"]) == [1, 2, 3]
+    assert list(metrics["head_y"]) == [s.snake.head.Y for s in states[1:]]
+    assert list(metrics["think_time_ns"]) == [0, 1, 2]
+    assert metrics["head_x"].dtype == np.int16
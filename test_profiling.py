@@ -0,0 +1,59 @@
+import time
+
+from profiling import DeterministicProfiler, SamplingProfiler
+
+
+def busy(seconds: float) -> int:
+    total = 0
+    deadline = time.process_time() + seconds
+    while time.process_time() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def outer() -> int:
+    return busy(0.05)
+
+
+def strip_locations(stack: str) -> str:
+    return ";".join(frame.split(" (")[0] for frame in stack.split(";"))
+
+
+def test_deterministic_profiler() -> None:
+    profiler = DeterministicProfiler()
+    profiler.enable()
+    outer()
+    profiler.disable()
+    assert "busy" in profiler.report()
+    stacks = profiler.collapsed_stacks()
+    assert "outer;busy" in [strip_locations(stack) for stack in stacks]
+
+
+def test_sampling_profiler() -> None:
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.enable()
+    outer()
+    profiler.disable()
+    stacks = profiler.collapsed_stacks()
+    assert sum(stacks.values()) > 0
+    assert any(strip_locations(stack).endswith("outer;busy") for stack in stacks)
+    assert "busy (test_profiling.py:" in profiler.report()
+
+
+def ping(depth: int) -> int:
+    return busy(0.05) if depth == 0 else pong(depth - 1)
+
+
+def pong(depth: int) -> int:
+    return ping(depth)
+
+
+def test_collapsed_stacks_of_recursive_calls() -> None:
+    profiler = DeterministicProfiler()
+    profiler.enable()
+    ping(200)
+    profiler.disable()
+    stacks = [strip_locations(stack) for stack in profiler.collapsed_stacks()]
+    assert any(stack.endswith("ping;busy") for stack in stacks)
+    # each function appears at most once per stack
+    assert all(len(set(frames := stack.split(";"))) == len(frames) for stack in stacks)
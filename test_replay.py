@@ -0,0 +1,41 @@
+import random
+
+from game import Game
+from replay import Replay, ReplayWriter, encode_action
+from utils import Coordinate, Direction
+
+
+def play(game: Game, ticks: int) -> list[Game]:
+    """Return the states visited by moving randomly (but safely, when possible)."""
+    random.seed("replay")
+    states = [game]
+    for _ in range(ticks):
+        safe = [s for s in states[-1].successors if not s.game_over]
+        if not safe:
+            break
+        states.append(random.choice(safe))
+    return states
+
+
+def test_round_trip(tmp_path, game: Game) -> None:
+    game = Game(grid_width=8, grid_height=8, snake=game.snake, food=game.food)
+    states = play(game, ticks=50)
+    path = tmp_path / "game.snkr"
+    with ReplayWriter(path, states[0], seed="test-seed") as writer:
+        for state in states[1:]:
+            writer.record(state)
+
+    replay = Replay.load(path)
+    assert replay.seed == "test-seed"
+    assert len(replay) == len(states) - 1
+    for expected, actual in zip(states, replay.states()):
+        assert actual == expected
+        assert actual.ticks == expected.ticks
+    assert replay.state_at(10) == states[10]
+    assert replay.final_state == states[-1]
+
+
+def test_one_byte_per_action() -> None:
+    assert len(encode_action(Direction.UP)) == 1
+    spawned = frozenset({Coordinate(1, 2)})
+    assert len(encode_action(Direction.UP, spawned)) == 1 + 1 + 4
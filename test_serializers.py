@@ -1,4 +1,16 @@
-from serializers import _to_dict, _to_json, _to_yaml
+import pytest
+
+from game import Game
+from serializers import (
+    StreamWriter,
+    _serialize,
+    _serialize_uncompiled,
+    _to_dict,
+    _to_json,
+    _to_yaml,
+    read_stream,
+)
+from utils import Coordinate, PrioritizedItem
 
 
 def test_to_json(game):
@@ -36,3 +48,30 @@ def test_to_dict(game):
 
 def test_mixin_to_dict(game):
     assert game.to_dict() == _to_dict(game)
+
+
+def test_compiled_serializers_match_uncompiled(game):
+    objects = [
+        game,
+        game.snake,
+        game.food,
+        Coordinate(1, 2),
+        PrioritizedItem(priority=1.5, item=game),
+        {"b": [1, 2.5, "three"], "a": (None, game.snake)},
+        frozenset({Coordinate(0, 0), Coordinate(1, 1)}),
+    ]
+    for obj in objects:
+        # twice, because the first call compiles and caches the serializer
+        assert _serialize(obj) == _serialize_uncompiled(obj)
+        assert _serialize(obj) == _serialize_uncompiled(obj)
+
+
+@pytest.mark.parametrize("suffix", (".yml", ".jsonl"))
+def test_stream_round_trip(tmp_path, game, suffix):
+    states = [game, game.update(), game.update().update()]
+    path = (tmp_path / "history").with_suffix(suffix)
+    with StreamWriter(path) as writer:
+        for state in states:
+            writer.write(state)
+    assert list(read_stream(path, Game)) == states
+    assert next(read_stream(path)) == _to_dict(game)
@@ -64,3 +64,9 @@ def test_move() -> None:
 
         new_snake = old_snake.move(direction=direction, grow=True)
         assert new_snake.tail == old_snake.tail
+
+
+def test_bytes_round_trip() -> None:
+    # out of bounds coordinates are possible in game over states
+    snake = Snake(segments=(Coordinate(-1, 0), Coordinate(0, 0), Coordinate(0, 1)))
+    assert Snake.from_bytes(snake.to_bytes()) == snake
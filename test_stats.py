@@ -0,0 +1,97 @@
+import csv
+from collections import deque
+from dataclasses import replace
+from typing import Iterator
+
+import pytest
+
+import stats
+from game import Game
+from stats import GameStats, histogram_text
+from streaming_stats import Histogram
+
+
+@pytest.fixture
+def game_stats(tmp_path, monkeypatch) -> Iterator[type[GameStats]]:
+    """GameStats, writing to ``tmp_path`` and starting from no games."""
+    monkeypatch.setattr(stats, "GAME_STATS_DIR", tmp_path)
+    monkeypatch.setattr(stats, "GAME_STATS_FILE_PATH", tmp_path / "stats.csv")
+    monkeypatch.setattr(stats.atexit, "register", lambda function: None)
+    monkeypatch.setattr(GameStats, "full_history", deque(maxlen=GameStats.HISTORY_WINDOW))
+    monkeypatch.setattr(GameStats, "_games", deque(maxlen=GameStats.SUMMARY_WINDOW))
+    for name, value in {
+        "games_played": 0,
+        "games_exported": 0,
+        "_replay": None,
+        "_history_writer": None,
+        "_ascii_file": None,
+        "_csv_file": None,
+        "_run_started_at": None,
+    }.items():
+        monkeypatch.setattr(GameStats, name, value)
+    yield GameStats
+    GameStats.close()
+
+
+def play(game_stats: type[GameStats], game: Game, games: int, ticks: int = 3) -> None:
+    game = replace(game, grid_width=20, grid_height=20)
+    for _ in range(games):
+        game_stats.new_game(game)
+        state = game
+        for _ in range(ticks):
+            state = state.update()
+            game_stats.update_game(state)
+
+
+def read_csv() -> list[list[str]]:
+    with stats.GAME_STATS_FILE_PATH.open(newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_summaries_are_appended_in_order(game_stats, game: Game) -> None:
+    play(game_stats, game, games=3)
+    # the last game is only exported once it's finished
+    assert read_csv() == [["1", "3", "0"], ["2", "3", "0"]]
+    game_stats.finish_game()
+    game_stats.finish_game()
+    game_stats.close()
+    assert [row[0] for row in read_csv()] == ["1", "2", "3"]
+
+
+def test_summaries_are_fsynced_every_few_games(game_stats, game: Game, monkeypatch) -> None:
+    synced: list[int] = []
+    monkeypatch.setattr(stats.os, "fsync", lambda fd: synced.append(game_stats.games_exported))
+    monkeypatch.setattr(GameStats, "FSYNC_EVERY", 3)
+    play(game_stats, game, games=8, ticks=1)
+    assert synced == [3, 6]
+    game_stats.close()
+    assert synced == [3, 6, 8]
+
+
+def test_close_is_registered_at_exit(game_stats, game: Game, monkeypatch) -> None:
+    registered: list = []
+    monkeypatch.setattr(stats.atexit, "register", registered.append)
+    play(game_stats, game, games=3, ticks=1)
+    assert registered == [game_stats.close]
+    registered[0]()
+    assert game_stats._csv_file is None
+    assert len(read_csv()) == 3
+
+
+def test_memory_is_bounded_by_windows(game_stats, game: Game, monkeypatch) -> None:
+    monkeypatch.setattr(GameStats, "full_history", deque(maxlen=4))
+    monkeypatch.setattr(GameStats, "_games", deque(maxlen=2))
+    play(game_stats, game, games=3, ticks=6)
+    assert len(game_stats.full_history) == 4
+    assert game_stats.full_history[-1].ticks == 6
+    assert [row[0] for row in game_stats.rows(colors=False, count=0)] == ["3", "2"]
+    game_stats.close()
+    # every game is still exported
+    assert [row[0] for row in read_csv()] == ["1", "2", "3"]
+
+
+def test_histogram_text_counts_overflow() -> None:
+    histogram = Histogram(lower=0, upper=100, buckets=4)
+    for value in (10, 60, 150, 1_000):
+        histogram.add(value)
+    assert histogram_text(histogram) == "█ █  +2 ≥100"
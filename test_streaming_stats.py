@@ -0,0 +1,83 @@
+import math
+import random
+import statistics
+
+import pytest
+
+from streaming_stats import (
+    Histogram,
+    LogHistogram,
+    MetricSummary,
+    P2Quantile,
+    RunningStats,
+)
+
+
+def test_running_stats() -> None:
+    random.seed("running stats")
+    values = [random.gauss(10, 3) for _ in range(1000)]
+    running = RunningStats()
+    for value in values:
+        running.add(value)
+    assert running.count == len(values)
+    assert running.mean == pytest.approx(statistics.mean(values))
+    assert running.variance == pytest.approx(statistics.variance(values))
+    assert running.min == min(values)
+    assert running.max == max(values)
+
+
+@pytest.mark.parametrize("quantile", (0.5, 0.9, 0.99))
+def test_p2_quantile(quantile: float) -> None:
+    random.seed("p2")
+    values = [random.random() for _ in range(10_000)]
+    estimator = P2Quantile(quantile)
+    for value in values:
+        estimator.add(value)
+    # uniform(0, 1), so the true quantile is the quantile itself
+    assert estimator.value == pytest.approx(quantile, abs=0.02)
+
+
+def test_p2_quantile_few_values() -> None:
+    estimator = P2Quantile(0.5)
+    assert estimator.value != estimator.value  # nan
+    for value in (3, 1, 2):
+        estimator.add(value)
+    assert estimator.value == 2
+
+
+def test_histogram() -> None:
+    histogram = Histogram(lower=0, upper=10, buckets=5)
+    for value in (-1, 0, 1.9, 2, 9.999, 10, 11):
+        histogram.add(value)
+    assert histogram.underflow == 1
+    assert histogram.overflow == 2
+    assert histogram.counts == [2, 1, 0, 0, 1]
+    assert histogram.edges == [0, 2, 4, 6, 8, 10]
+    assert histogram.sparkline() == "█▄  ▄"
+    assert Histogram(lower=0, upper=1, buckets=3).sparkline() == "   "
+
+
+def test_metric_summary() -> None:
+    summary = MetricSummary("score", histogram=Histogram(lower=0, upper=100, buckets=10))
+    for value in range(100):
+        summary.add(value)
+    assert summary.moments.count == 100
+    assert summary.quantile(0.5) == pytest.approx(49.5, abs=1)
+    assert summary.histogram is not None
+    assert summary.histogram.counts == [10] * 10
+
+
+def test_log_histogram() -> None:
+    random.seed("log histogram")
+    values = [int(random.lognormvariate(10, 2)) for _ in range(10_000)] + [0, 1, 2**50 - 1]
+    one_by_one, bulk = LogHistogram(), LogHistogram()
+    for value in values:
+        one_by_one.add(value)
+    bulk.add_many(values)
+    assert one_by_one.counts == bulk.counts
+    assert (bulk.count, bulk.total) == (len(values), sum(values))
+    assert (bulk.min, bulk.max) == (0, 2**50 - 1)
+    for q in (0.5, 0.9, 0.99):
+        exact = sorted(values)[math.ceil(q * len(values)) - 1]
+        assert bulk.quantile(q) == bulk.bucket(exact)
+        assert exact * (1 - 2**-6) <= bulk.quantile(q) <= exact
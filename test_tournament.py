@@ -0,0 +1,67 @@
+import csv
+import signal
+import time
+
+import pytest
+
+from tournament import (
+    MatchResult,
+    TimeCap,
+    parse_grid_size,
+    play_match,
+    run_tournament,
+    time_cap,
+    write_csv,
+)
+
+
+def test_play_match_caps() -> None:
+    result = play_match("Spinner", "0", 8, 8, food=2, max_ticks=50, max_seconds=60)
+    assert (result.ticks, result.outcome) == (50, "tick cap")
+    result = play_match("Spinner", "0", 8, 8, food=2, max_ticks=10**9, max_seconds=0.05)
+    assert result.outcome == "time cap"
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs SIGALRM")
+def test_time_cap_interrupts_and_disarms() -> None:
+    handler = signal.getsignal(signal.SIGALRM)
+    with pytest.raises(TimeCap):
+        with time_cap(0.01):
+            time.sleep(5)
+    with time_cap(60):
+        pass
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    assert signal.getsignal(signal.SIGALRM) is handler
+
+
+def test_play_match_is_reproducible() -> None:
+    assert play_match("GentleBrute", "1", 8, 8, 2, 500, 60).score == (
+        play_match("GentleBrute", "1", 8, 8, 2, 500, 60).score
+    )
+
+
+def test_run_tournament(tmp_path) -> None:
+    results = run_tournament(
+        agents=["Spinner", "GentleBrute"],
+        seeds=["0", "1"],
+        grid_sizes=[(8, 8), (6, 4)],
+        foods=[1],
+        max_ticks=100,
+        max_seconds=60,
+        workers=2,
+    )
+    assert len(results) == 8
+    assert [r.agent for r in results] == ["GentleBrute"] * 4 + ["Spinner"] * 4
+    assert all(isinstance(r, MatchResult) and r.ticks <= 100 for r in results)
+
+    path = tmp_path / "results.csv"
+    write_csv(results, path)
+    rows = list(csv.DictReader(path.open()))
+    assert len(rows) == 8
+    assert rows[0]["agent"] == "GentleBrute" and "ticks_per_second" in rows[0]
+
+
+def test_parse_grid_size() -> None:
+    assert parse_grid_size("12x8") == (12, 8)
+    with pytest.raises(ValueError):
+        parse_grid_size("12")
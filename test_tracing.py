@@ -0,0 +1,28 @@
+import json
+
+import tracing
+
+
+def test_traced_and_dump(tmp_path, monkeypatch) -> None:
+    @tracing.traced("double", "test")
+    def double(x: int) -> int:
+        return 2 * x
+
+    @tracing.traced("outer", "test")
+    def double_all(xs: range) -> list[int]:
+        return [double(x) for x in xs]
+
+    assert double(1) == 2  # not recorded (tracing is disabled)
+    tracer = tracing.Tracer(capacity=4)
+    monkeypatch.setattr(tracing, "TRACER", tracer)
+    assert double_all(range(4)) == [0, 2, 4, 6]
+    tracer.complete("tick", "test", 0, 1_000, {"tick": 4})
+
+    path = tmp_path / "trace.json"
+    tracer.dump(path)
+    events = [e for e in json.loads(path.read_text())["traceEvents"] if e["ph"] == "X"]
+    # the ring buffer only keeps the most recent events
+    assert [e["name"] for e in events] == ["double", "double", "outer", "tick"]
+    assert events[-1]["args"] == {"tick": 4}
+    outer, inner = events[2], events[0]
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
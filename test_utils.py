@@ -5,7 +5,7 @@ import random
 import pytest
 
 from game import Game
-from utils import Coordinate, Direction, PriorityQueue
+from utils import Coordinate, Direction, PriorityQueue, coordinate_table
 
 
 @pytest.mark.parametrize(
@@ -40,3 +40,23 @@ def test_priority_queue(game: Game) -> None:
 @pytest.mark.parametrize("n", range(10))
 def test_coord_random(n):
     assert len(Coordinate.random(n=n, grid_width=5, grid_height=5)) == n
+
+
+def test_coordinate_table() -> None:
+    table = coordinate_table(4, 3)
+    assert table is coordinate_table(4, 3)
+    assert table.cells == tuple(Coordinate(x, y) for x in range(4) for y in range(3))
+    assert table.at(2, 1) is table.cells[7]
+    assert table.neighbors[table.at(0, 0)][Direction.LEFT] == (-1, 0)  # on the border
+    assert table.neighbors[table.at(0, 0)][Direction.DOWN] is table.at(0, 1)
+    assert set(table.adjacent[table.at(0, 0)]) == {(1, 0), (0, 1)}
+    with pytest.raises(Exception, match="off the 4x3 table"):
+        table.at(5, 0)
+
+
+def test_moves_use_shared_coordinates(game: Game) -> None:
+    table = coordinate_table(game.grid_width, game.grid_height)
+    for successor in game.successors:
+        head = successor.snake.head
+        assert head is table.at(*head)
+    assert all(food is table.at(*food) for food in Coordinate.random(5, 5, n=25))
@@ -0,0 +1,47 @@
+import pytest
+
+from game import Game
+from replay import Replay, ReplayWriter
+from test_replay import play
+from video import frame_array, frames, render, write_raw
+
+
+@pytest.fixture(autouse=True)
+def dummy_video_driver(monkeypatch) -> None:
+    """Keep any display SDL opens offscreen."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+
+
+def record(tmp_path, game: Game) -> Replay:
+    game = Game(grid_width=8, grid_height=8, snake=game.snake, food=game.food)
+    states = play(game, ticks=30)
+    path = tmp_path / "game.snkr"
+    with ReplayWriter(path, states[0]) as writer:
+        for state in states[1:]:
+            writer.record(state)
+    return Replay.load(path)
+
+
+def test_incremental_frames_match_full_redraws(tmp_path, game: Game) -> None:
+    replay = record(tmp_path, game)
+    count = 0
+    for view in render(replay, screen_width=80, screen_height=80):
+        incremental = frame_array(view)
+        view.draw_all()
+        assert (incremental == frame_array(view)).all()
+        count += 1
+    assert count == len(replay) + 1
+
+
+def test_frame_shape_and_every(tmp_path, game: Game) -> None:
+    replay = record(tmp_path, game)
+    rendered = list(frames(replay, screen_width=64, screen_height=48, every=10))
+    assert len(rendered) == len(range(0, len(replay) + 1, 10)) + (len(replay) % 10 != 0)
+    assert rendered[0].shape == (48, 64, 3)
+
+
+def test_write_raw(tmp_path, game: Game) -> None:
+    replay = record(tmp_path, game)
+    with open(tmp_path / "frames.rgb", "wb") as f:
+        count = write_raw(replay, f, screen_width=32, screen_height=16)
+    assert (tmp_path / "frames.rgb").stat().st_size == count * 32 * 16 * 3
@@ -0,0 +1,88 @@
+"""Per-tick latency histograms of each phase of the game loop (enable with ``--timings``).
+
+When enabled, ``Controller.game_loop`` times each phase of every tick with ``perf_counter_ns``:
+
+* events: getting pygame events and calling the on_pygame_event hooks
+* agent: choosing the next action (``Controller.get_action``)
+* simulation: ``Game.update``
+* hook:<name>: each on_tick hook
+* clock: waiting for the next frame (``clock.tick``)
+
+To keep the cost per tick low, durations are appended to lists and only binned into
+``streaming_stats.LogHistogram``s (in bulk, with NumPy) when the lists fill up or a report is
+needed.
+"""
+import logging
+
+from rich.console import Console
+from rich.table import Table
+
+import controllers
+from streaming_stats import LogHistogram
+
+
+class PhaseTimings(controllers.Recorder):
+    """Durations (in ns) of each phase of the game loop, across every tick of every game.
+
+    Once installed (see ``install``), it reports the durations at game over and at exit.
+    """
+
+    # pending durations of a phase are binned once there are this many
+    FLUSH_EVERY = 4096
+
+    def __init__(self) -> None:
+        self.pending: dict[str, list[int]] = {}
+        self.histograms: dict[str, LogHistogram] = {}
+
+    def phase(self, name: str) -> list[int]:
+        """Return the list to append durations of the named phase to."""
+        if name not in self.pending:
+            self.pending[name] = []
+            self.histograms[name] = LogHistogram()
+        return self.pending[name]
+
+    def flush(self) -> None:
+        """Bin all pending durations into the histograms."""
+        for name, durations in self.pending.items():
+            if durations:
+                self.histograms[name].add_many(durations)
+                durations.clear()
+
+    def table(self) -> Table:
+        """Return the p50, p99 and max duration of every phase (in µs) in a rich.table.Table."""
+        self.flush()
+        table = Table("phase", "n", "p50 (µs)", "p99 (µs)", "max (µs)", "total (s)")
+        for name, histogram in self.histograms.items():
+            table.add_row(
+                name,
+                str(histogram.count),
+                *(
+                    f"{value / 1e3:.3g}"
+                    for value in (
+                        histogram.quantile(0.5),
+                        histogram.quantile(0.99),
+                        histogram.max or 0,
+                    )
+                ),
+                f"{histogram.total / 1e9:.3g}",
+            )
+        return table
+
+    def on_game_over(self, controller: controllers.Controller) -> None:
+        logging.info(f"Phase timings after game over:\n{render(self.table())}")
+
+    def close(self) -> None:
+        Console(stderr=True).print(self.table())
+
+
+def render(table: Table) -> str:
+    console = Console(width=120)
+    with console.capture() as capture:
+        console.print(table)
+    return capture.get()
+
+
+def install() -> PhaseTimings:
+    """Start timing every phase of the game loop, reporting at game over and at exit."""
+    controllers.TIMINGS = controllers.install_recorder(PhaseTimings())
+    return controllers.TIMINGS
@@ -0,0 +1,238 @@
+"""Headless tournaments between agents (run with ``./run tournament ...``).
+
+Every combination of agent, seed, grid size and food count is played as one game ("match") in a
+process pool, without pygame or any hooks. Each match reseeds the random number generator of its
+worker process with its seed, so a match plays out the same regardless of which worker runs it or
+what ran there before (and starts from the same game as ``./run --seed SEED agent AGENT``).
+
+A match ends at game over, after ``max_ticks`` ticks or after ``max_seconds`` seconds, or when
+the agent raises an exception. On Unix, the time cap interrupts the agent mid-search (with a
+``SIGALRM`` timer), so a single slow search can't hold up a worker; elsewhere it's only checked
+between ticks. The results are written to a CSV file and printed as a table.
+
+Agents that iterate over sets of Directions depend on Python's hash seed, so to reproduce results
+exactly across tournaments, also fix ``PYTHONHASHSEED`` (workers inherit it from the parent).
+"""
+import csv
+import random
+import signal
+import time
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields
+from itertools import product
+from pathlib import Path
+from statistics import mean
+from types import FrameType
+from typing import Iterable, Iterator
+
+from rich.console import Console
+from rich.table import Table
+
+import controllers
+from game import Game
+from utils import Coordinate
+
+# keyword arguments for agents whose defaults don't suit a tournament
+AGENT_KWARGS = {"QQ": {"dump": False}}
+
+
+class TimeCap(Exception):
+    pass
+
+
+@contextmanager
+def time_cap(seconds: float) -> Iterator[None]:
+    """Raise TimeCap in the body of the ``with`` statement after ``seconds`` (on Unix only).
+
+    The alarm is disarmed as soon as the body ends, so a late alarm can't interrupt anything else.
+    """
+    if not hasattr(signal, "setitimer"):
+        yield
+        return
+    armed = True
+
+    def raise_time_cap(signal_number: int, frame: FrameType | None) -> None:
+        if armed:
+            raise TimeCap()
+
+    previous_handler = signal.signal(signal.SIGALRM, raise_time_cap)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        armed = False
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+@dataclass(frozen=True, kw_only=True, slots=True)
+class MatchResult:
+    agent: str
+    seed: str
+    grid_width: int
+    grid_height: int
+    food: int
+    score: int
+    ticks: int
+    wall_seconds: float
+    outcome: str
+    """game over, tick cap, time cap or the agent's error"""
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.wall_seconds if self.wall_seconds else 0.0
+
+
+def play_match(
+    agent: str,
+    seed: str,
+    grid_width: int,
+    grid_height: int,
+    food: int,
+    max_ticks: int,
+    max_seconds: float,
+) -> MatchResult:
+    """Play one game of ``agent`` (the name of a BaseAgent subclass) and return the result."""
+    random.seed(seed)
+    game = Game(
+        food=Coordinate.random(grid_width=grid_width, grid_height=grid_height, n=food),
+        grid_width=grid_width,
+        grid_height=grid_height,
+    )
+    controller = controllers.Agent(
+        agent_class=agent, agent_kwargs=AGENT_KWARGS.get(agent), game=game, seed=seed
+    )
+    outcome = "game over"
+    start = time.perf_counter()
+    deadline = start + max_seconds
+    try:
+        with time_cap(max_seconds):
+            while not controller.game.game_over:
+                if controller.game.ticks >= max_ticks:
+                    outcome = "tick cap"
+                    break
+                if time.perf_counter() >= deadline:
+                    outcome = "time cap"
+                    break
+                controller.game = controller.game.update(controller.get_action(events=[]))
+    except TimeCap:
+        outcome = "time cap"
+    except Exception as ex:
+        outcome = f"error: {ex}"
+    finally:
+        controller.close()
+    return MatchResult(
+        agent=agent,
+        seed=seed,
+        grid_width=grid_width,
+        grid_height=grid_height,
+        food=food,
+        score=controller.game.score,
+        ticks=controller.game.ticks,
+        wall_seconds=time.perf_counter() - start,
+        outcome=outcome,
+    )
+
+
+def run_tournament(
+    agents: Iterable[str],
+    seeds: Iterable[str],
+    grid_sizes: Iterable[tuple[int, int]],
+    foods: Iterable[int],
+    max_ticks: int,
+    max_seconds: float,
+    workers: int | None = None,
+) -> list[MatchResult]:
+    """Play every combination of the arguments in a pool of ``workers`` processes.
+
+    Results are sorted by agent, grid size, food count and seed.
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(play_match, agent, seed, width, height, food, max_ticks, max_seconds)
+            for agent, seed, (width, height), food in product(agents, seeds, grid_sizes, foods)
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return sorted(results, key=lambda r: (r.agent, r.grid_width, r.grid_height, r.food, r.seed))
+
+
+def write_csv(results: list[MatchResult], path: Path | str) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([field.name for field in fields(MatchResult)] + ["ticks_per_second"])
+        for result in results:
+            writer.writerow([*asdict(result).values(), f"{result.ticks_per_second:.1f}"])
+
+
+def results_table(results: list[MatchResult]) -> Table:
+    table = Table(
+        "agent",
+        "grid",
+        "food",
+        "seed",
+        "score",
+        "ticks",
+        "wall (s)",
+        "ticks/s",
+        "outcome",
+        title="Matches",
+    )
+    for r in results:
+        table.add_row(
+            r.agent,
+            f"{r.grid_width}x{r.grid_height}",
+            str(r.food),
+            r.seed,
+            str(r.score),
+            str(r.ticks),
+            f"{r.wall_seconds:.3f}",
+            f"{r.ticks_per_second:.0f}",
+            r.outcome,
+        )
+    return table
+
+
+def summary_table(results: list[MatchResult]) -> Table:
+    """Return each agent's mean and max score, and its overall ticks per second."""
+    table = Table("agent", "matches", "mean score", "max score", "ticks/s", title="Agents")
+    for agent in sorted({r.agent for r in results}):
+        matches = [r for r in results if r.agent == agent]
+        wall_seconds = sum(r.wall_seconds for r in matches)
+        table.add_row(
+            agent,
+            str(len(matches)),
+            f"{mean(r.score for r in matches):.2f}",
+            str(max(r.score for r in matches)),
+            f"{sum(r.ticks for r in matches) / wall_seconds:.0f}" if wall_seconds else "-",
+        )
+    return table
+
+
+def parse_grid_size(grid_size: str) -> tuple[int, int]:
+    """Parse a "WIDTHxHEIGHT" grid size, e.g., "12x8" (raises ValueError if invalid)."""
+    width, height = grid_size.split("x")
+    return int(width), int(height)
+
+
+def main(args: Namespace) -> None:
+    """Run a tournament from the ``tournament`` subcommand's arguments (see cli.py)."""
+    results = run_tournament(
+        agents=args.agents,
+        seeds=args.seeds,
+        grid_sizes=args.grid_sizes or [(args.grid_width, args.grid_height)],
+        foods=args.foods or [args.food],
+        max_ticks=args.max_ticks,
+        max_seconds=args.max_seconds,
+        workers=args.workers,
+    )
+    write_csv(results, args.output)
+    console = Console()
+    console.print(results_table(results))
+    console.print(summary_table(results))
+    console.print(f"Results written to {args.output}")
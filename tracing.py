@@ -0,0 +1,114 @@
+"""Optional timeline tracing of a run, exported in Chrome's trace event format.
+
+Enable with ``./run --trace PATH ...`` (or ``install(PATH)``), then open the file in
+https://ui.perfetto.dev or chrome://tracing to see every tick (split into its phases and hooks),
+A* search, stats I/O call, dashboard refresh and garbage collection on a timeline.
+
+Events are kept in a ring buffer, so only the most recent ``capacity`` events are written (when
+the process exits, or by calling ``dump``). When tracing is disabled, ``traced`` functions cost
+one extra function call and a global lookup.
+
+Trace event format:
+    https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+"""
+import atexit
+import functools
+import gc
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Tracer:
+    """A ring buffer of complete ("X") trace events, timed with ``perf_counter_ns``."""
+
+    def __init__(self, capacity: int = 1_000_000) -> None:
+        self.events: deque[tuple[str, str, int, int, int, dict[str, Any] | None]] = deque(
+            maxlen=capacity
+        )
+        self.thread_names: dict[int, str] = {}
+        self._gc_started_at: int | None = None
+
+    def complete(
+        self,
+        name: str,
+        category: str,
+        start_ns: int,
+        end_ns: int,
+        args: dict[str, Any] | None = None,
+    ) -> None:
+        """Record an event that started at ``start_ns`` and ended at ``end_ns``."""
+        thread_id = threading.get_ident()
+        if thread_id not in self.thread_names:
+            self.thread_names[thread_id] = threading.current_thread().name
+        self.events.append((name, category, start_ns, end_ns - start_ns, thread_id, args))
+
+    def on_gc(self, phase: str, info: dict[str, Any]) -> None:
+        """A ``gc.callbacks`` callback recording each garbage collection."""
+        if phase == "start":
+            self._gc_started_at = time.perf_counter_ns()
+        elif self._gc_started_at is not None:
+            self.complete("gc", "gc", self._gc_started_at, time.perf_counter_ns(), dict(info))
+            self._gc_started_at = None
+
+    def to_json(self) -> dict[str, Any]:
+        pid = os.getpid()
+        trace_events: list[dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self.thread_names.items()
+        ]
+        for name, category, start_ns, duration_ns, tid, args in list(self.events):
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start_ns / 1e3,
+                "dur": duration_ns / 1e3,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            trace_events.append(event)
+        return {"traceEvents": trace_events, "displayTimeUnit": "ns"}
+
+    def dump(self, path: Path | str) -> None:
+        with Path(path).open("w") as f:
+            json.dump(self.to_json(), f)
+
+
+TRACER: Tracer | None = None
+
+
+def traced(name: str, category: str) -> Callable[[F], F]:
+    """Decorate a function to record each of its calls while tracing is enabled."""
+
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if TRACER is None:
+                return function(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                TRACER.complete(name, category, start_ns, time.perf_counter_ns())
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def install(path: Path | str, capacity: int = 1_000_000) -> Tracer:
+    """Start tracing (including garbage collections), and write the trace to ``path`` at exit."""
+    global TRACER
+    TRACER = Tracer(capacity)
+    gc.callbacks.append(TRACER.on_gc)
+    atexit.register(TRACER.dump, path)
+    return TRACER
@@ -5,6 +5,7 @@ import time
 from collections.abc import Collection
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import cache
 from pathlib import Path
 from typing import Any, Callable, Iterable, NamedTuple
 
@@ -69,6 +70,15 @@ class Direction(enum.Enum):
         return valid[self]
 
 
+# the (X, Y) change of moving one cell in each direction
+STEPS = {
+    Direction.LEFT: (-1, 0),
+    Direction.RIGHT: (1, 0),
+    Direction.UP: (0, -1),
+    Direction.DOWN: (0, 1),
+}
+
+
 @dataclass(frozen=True, eq=True, order=True, kw_only=True, slots=True)
 class PrioritizedItem(SerializerMixin):
     """Helper class for PriorityQueue."""
@@ -163,8 +173,9 @@ class Coordinate(NamedTuple):
         # this method is mostly used for generating new food, so in nearly every
         # instance, drawing two random numbers will give us a random coordinate
         # that is not in the exclude set
+        table = coordinate_table(grid_width, grid_height)
         if n == 1:
-            candidate = Coordinate(
+            candidate = table.at(
                 random.randint(0, (grid_width - 1)),
                 random.randint(0, (grid_height - 1)),
             )
@@ -178,16 +189,58 @@ class Coordinate(NamedTuple):
         if grid_size < (len(exclude)) + n:
             raise Exception(f"Requested {n} random coords with {grid_size=} and {len(exclude)=}")
 
-        possible_coords = [
-            candidate
-            for x in range(grid_width)  # +1 because range end is non-inclusive
-            for y in range(grid_height)
-            if (candidate := Coordinate(x, y)) not in exclude
-        ]
+        possible_coords = [candidate for candidate in table.cells if candidate not in exclude]
         random.shuffle(possible_coords)
         return frozenset(possible_coords[:n])
 
 
+class CoordinateTable:
+    """Shared ``Coordinate`` instances for the cells of a grid, and their neighbors.
+
+    Looking cells up here, rather than creating them, means moving around the grid allocates no
+    new coordinates. The table also covers a border of cells just off the grid, where a snake's
+    head ends up when it leaves the grid. Get a grid size's table with ``coordinate_table``.
+    """
+
+    def __init__(self, grid_width: int, grid_height: int) -> None:
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        # columns[x + 1][y + 1] is (x, y), including the border (x or y of -1, or the width/height)
+        self.columns = tuple(
+            tuple(Coordinate(x, y) for y in range(-1, grid_height + 1))
+            for x in range(-1, grid_width + 1)
+        )
+        self.cells = tuple(cell for column in self.columns[1:-1] for cell in column[1:-1])
+        """the cells on the grid, column by column"""
+        self.neighbors = {
+            cell: {
+                direction: self.at(cell.X + dx, cell.Y + dy)
+                for direction, (dx, dy) in STEPS.items()
+            }
+            for cell in self.cells
+        }
+        """each cell's neighbor in each direction (which may be on the border)"""
+        self.adjacent = {
+            cell: tuple(n for n in neighbors.values() if self.on_grid(n))
+            for cell, neighbors in self.neighbors.items()
+        }
+        """each cell's neighbors on the grid"""
+
+    def on_grid(self, cell: tuple[int, int]) -> bool:
+        return 0 <= cell[0] < self.grid_width and 0 <= cell[1] < self.grid_height
+
+    def at(self, x: int, y: int) -> Coordinate:
+        """Return the shared instance of (x, y), which must be on the grid or its border."""
+        if not (-1 <= x <= self.grid_width and -1 <= y <= self.grid_height):
+            raise Exception(f"{(x, y)=} is off the {self.grid_width}x{self.grid_height} table")
+        return self.columns[x + 1][y + 1]
+
+
+@cache
+def coordinate_table(grid_width: int, grid_height: int) -> CoordinateTable:
+    return CoordinateTable(grid_width, grid_height)
+
+
 def manhattan_distance(xy1: tuple[int, int], xy2: tuple[int, int]) -> int:
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs(xy1[0] - xy2[0]) + abs(xy1[1] - xy2[1])
@@ -0,0 +1,126 @@
+"""Render recorded games (see replay.py) to frames, offscreen and as fast as possible.
+
+Frames are drawn by ``views.OffscreenGameView`` (the same drawing code as the game window), so
+no display is needed. For example, to render a replay to PNG files:
+
+    python video.py game-stats/game-history.1.snkr --png frames/
+
+or to an MP4, by piping raw RGB frames to ffmpeg:
+
+    python video.py game-stats/game-history.1.snkr --raw - \\
+        | ffmpeg -f rawvideo -pix_fmt rgb24 -s 1200x800 -r 25 -i - game.mp4
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+import numpy as np
+import pygame
+
+from replay import Replay
+from views import OffscreenGameView
+
+
+def render(replay: Replay, screen_width: int = 1200, screen_height: int = 800, every: int = 1):
+    """Lazily draw every ``every``-th state (and the final state) of ``replay``, yielding the view
+    after each frame.
+
+    The view's ``game_window`` is drawn incrementally, so copy it (e.g., with ``frame_array``)
+    before advancing the iterator if it's needed later.
+    """
+    pygame.font.init()
+    view: OffscreenGameView | None = None
+    for tick, game in enumerate(replay.states()):
+        if tick % every and tick != len(replay):
+            continue
+        if view is None:
+            view = OffscreenGameView(
+                game=game,
+                caption="snAIke",
+                screen_width=screen_width,
+                screen_height=screen_height,
+                frame_rate=0,
+            )
+        view.update(game)
+        yield view
+
+
+def frame_array(view: OffscreenGameView) -> np.ndarray:
+    """Return a (read-only) copy of the current frame as a (height, width, 3) RGB array."""
+    # much faster than pygame.surfarray.array3d, which returns a (width, height, 3) array
+    width, height = view.game_window.get_size()
+    rgb = pygame.image.tobytes(view.game_window, "RGB")
+    return np.frombuffer(rgb, dtype=np.uint8).reshape(height, width, 3)
+
+
+def frames(replay: Replay, **kwargs) -> Iterator[np.ndarray]:
+    """Yield every frame of ``replay`` as an array (see ``render`` for the keyword arguments)."""
+    for view in render(replay, **kwargs):
+        yield frame_array(view)
+
+
+def write_png_sequence(replay: Replay, directory: Path, **kwargs) -> int:
+    """Save every frame of ``replay`` to ``directory`` as frame-000000.png, etc.
+
+    Returns the number of frames written.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for count, view in enumerate(render(replay, **kwargs), start=1):
+        pygame.image.save(view.game_window, directory / f"frame-{count - 1:06d}.png")
+    return count
+
+
+def write_raw(replay: Replay, stream: BinaryIO, **kwargs) -> int:
+    """Write every frame of ``replay`` to ``stream`` as packed 8-bit RGB (i.e., ffmpeg's rgb24).
+
+    Returns the number of frames written.
+    """
+    count = 0
+    for view in render(replay, **kwargs):
+        stream.write(pygame.image.tobytes(view.game_window, "RGB"))
+        count += 1
+    return count
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description="Render a replay (.snkr) file to frames.")
+    argparser.add_argument("replay", type=Path, help="The replay file to render.")
+    output_group = argparser.add_mutually_exclusive_group(required=True)
+    output_group.add_argument(
+        "--png", type=Path, help="Save each frame as a PNG file in the given directory."
+    )
+    output_group.add_argument(
+        "--raw",
+        type=str,
+        help="Write raw rgb24 frames to the given file (or - for stdout), e.g., for ffmpeg.",
+    )
+    argparser.add_argument("--screen-width", default=1200, type=int, help="Frame width in pixels.")
+    argparser.add_argument("--screen-height", default=800, type=int, help="Frame height in pixels.")
+    argparser.add_argument(
+        "--every", default=1, type=int, help="Only render every n-th state (plus the final state)."
+    )
+    args = argparser.parse_args()
+    # frames are drawn offscreen, so never open a window (even if something inits the display)
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    replay = Replay.load(args.replay)
+    kwargs = {
+        "screen_width": args.screen_width,
+        "screen_height": args.screen_height,
+        "every": args.every,
+    }
+    if args.png:
+        count = write_png_sequence(replay, args.png, **kwargs)
+    elif args.raw == "-":
+        count = write_raw(replay, sys.stdout.buffer, **kwargs)
+    else:
+        with open(args.raw, "wb") as f:
+            count = write_raw(replay, f, **kwargs)
+    print(f"Rendered {count} frames", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
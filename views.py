@@ -5,8 +5,15 @@ from typing import Any
 
 import pygame
 
-from game import Game
-from utils import Color
+from game import (
+    BLANK_SYMBOL,
+    FOOD_SYMBOL,
+    SNAKE_SYMBOL,
+    Game,
+    cell_changes,
+    changed_cell_symbol,
+)
+from utils import Color, Coordinate
 
 
 class GameView(abc.ABC):
@@ -16,6 +23,19 @@ class GameView(abc.ABC):
 
 
 class GraphicsGameView(GameView):
+    """Draws the game with pygame.
+
+    Only the cells that changed since the previous frame are redrawn and pushed to the display
+    (see ``game.cell_changes``), and fonts and rendered score text are cached, so frames are
+    cheap even on big grids.
+    """
+
+    SYMBOL_COLORS = {
+        FOOD_SYMBOL: Color.WHITE.value,
+        SNAKE_SYMBOL: Color.GREEN.value,
+        BLANK_SYMBOL: Color.BLACK.value,
+    }
+
     def __init__(
         self,
         game: Game,
@@ -28,48 +48,84 @@ class GraphicsGameView(GameView):
         self.game = game
         self.game_over_font = pygame.font.SysFont("times", 20)
         self.default_font = pygame.font.SysFont("consolas", 20)
+        self.you_died_font = pygame.font.SysFont("times new roman", 90)
         self.frame_rate = frame_rate
-        self.game_window: pygame.surface.Surface = pygame.display.set_mode(
-            (screen_width, screen_height),
-        )
+        self.game_window = self.create_window(screen_width, screen_height)
         self.segment_width = screen_width / self.game.grid_width
         self.segment_height = screen_height / self.game.grid_height
+        self.previous: Game | None = None
+        self.score_rect: pygame.Rect | None = None
+        self._score_surfaces: dict[tuple[int, bool], pygame.surface.Surface] = {}
         logging.debug("GraphicsGameView initialized")
 
+    def create_window(self, screen_width: int, screen_height: int) -> pygame.surface.Surface:
+        return pygame.display.set_mode((screen_width, screen_height))
+
     def update(self, game: Game) -> None:
         self.game = game
-        self.draw()
-        pygame.display.update()
+        dirty_rects = self.draw()
+        pygame.display.update(dirty_rects)
+
+    def cell_rect(self, cell: Coordinate) -> pygame.Rect:
+        return pygame.Rect(
+            cell.X * self.segment_width,
+            cell.Y * self.segment_height,
+            self.segment_width,
+            self.segment_height,
+        )
+
+    def draw(self) -> list[pygame.Rect]:
+        """Draw the current game and return the areas of the window that changed."""
+        previous, self.previous = self.previous, self.game
+        changes = None if previous is None else cell_changes(previous, self.game)
+        if previous is None or changes is None or self.score_rect is None:
+            self.draw_all()
+            return [self.game_window.get_rect()]
 
-    def draw(self) -> None:
+        dirty_rects = []
+        for cell in changes:
+            rect = self.cell_rect(cell)
+            color = self.SYMBOL_COLORS[changed_cell_symbol(previous, self.game, cell)]
+            self.game_window.fill(color, rect)
+            dirty_rects.append(rect)
+
+        # the score is drawn on top of the grid, so it must be redrawn if it or anything beneath
+        # it changed (along with the cells beneath it)
+        if self.game.score != previous.score or self.score_rect.collidelist(dirty_rects) != -1:
+            old_score_rect = self.score_rect
+            self.redraw_cells_in(old_score_rect)
+            self.show_score()
+            dirty_rects.append(old_score_rect.union(self.score_rect))
+        return dirty_rects
+
+    def redraw_cells_in(self, area: pygame.Rect) -> None:
+        """Redraw every cell overlapping ``area`` (from scratch)."""
+        first_x = int(area.left // self.segment_width)
+        first_y = int(area.top // self.segment_height)
+        last_x = int(min(area.right // self.segment_width, self.game.grid_width - 1))
+        last_y = int(min(area.bottom // self.segment_height, self.game.grid_height - 1))
+        segments = set(self.game.snake.segments)
+        for x in range(first_x, last_x + 1):
+            for y in range(first_y, last_y + 1):
+                cell = Coordinate(x, y)
+                if cell in self.game.food:
+                    color = Color.WHITE.value
+                elif cell in segments:
+                    color = Color.GREEN.value
+                else:
+                    color = Color.BLACK.value
+                self.game_window.fill(color, self.cell_rect(cell))
+
+    def draw_all(self) -> None:
         self.game_window.fill(Color.BLACK.value)
         for segment in self.game.snake.segments:
-            pygame.draw.rect(
-                self.game_window,
-                Color.GREEN.value,
-                pygame.Rect(
-                    segment.X * self.segment_width,
-                    segment.Y * self.segment_height,
-                    self.segment_width,
-                    self.segment_height,
-                ),
-            )
+            pygame.draw.rect(self.game_window, Color.GREEN.value, self.cell_rect(segment))
 
         # Snake food
         for food_pos in self.game.food:
-            pygame.draw.rect(
-                self.game_window,
-                Color.WHITE.value,
-                pygame.Rect(
-                    food_pos.X * self.segment_width,
-                    food_pos.Y * self.segment_height,
-                    self.segment_width,
-                    self.segment_height,
-                ),
-            )
+            pygame.draw.rect(self.game_window, Color.WHITE.value, self.cell_rect(food_pos))
 
         if self.game.game_over:
-            you_died_font = pygame.font.SysFont("times new roman", 90)
             you_died_phrases = (
                 "You died.",
                 "YOU ARE DEAD",
@@ -84,7 +140,7 @@ class GraphicsGameView(GameView):
                 r"*** STOP: 0x105312",
                 "PLAYER_FAULT",
             )
-            game_over_surface = you_died_font.render(
+            game_over_surface = self.you_died_font.render(
                 random.choice(you_died_phrases), True, Color.RED.value
             )
             game_over_rect = game_over_surface.get_rect()
@@ -93,29 +149,44 @@ class GraphicsGameView(GameView):
                 self.game_window.get_height() // 4,
             )
             self.game_window.blit(game_over_surface, game_over_rect)
-            self.show_score()
-            pygame.display.flip()
-
-        else:
-            self.show_score()
+        self.show_score()
 
     def show_score(self) -> None:
-        score_font = pygame.font.SysFont("times" if self.game.game_over else "consolas", 20)
-        score_surface = score_font.render(
-            f"Score: {self.game.score}",
-            True,
-            Color.RED.value if self.game.game_over else Color.WHITE.value,
-        )
+        game_over = self.game.game_over
+        key = (self.game.score, game_over)
+        if (score_surface := self._score_surfaces.get(key)) is None:
+            score_font = self.game_over_font if game_over else self.default_font
+            score_surface = self._score_surfaces[key] = score_font.render(
+                f"Score: {self.game.score}",
+                True,
+                Color.RED.value if game_over else Color.WHITE.value,
+            )
         score_rect = score_surface.get_rect()
         score_rect.midtop = (
             (
                 self.game_window.get_width() // 2,
                 int(self.game_window.get_height() // 1.25),
             )
-            if self.game.game_over
+            if game_over
             else (self.game_window.get_width() // 10, 15)
         )
         self.game_window.blit(score_surface, score_rect)
+        self.score_rect = score_rect
+
+
+class OffscreenGameView(GraphicsGameView):
+    """Draws the game like ``GraphicsGameView``, but to a plain surface instead of a window.
+
+    Only ``pygame.font`` needs to be initialized (not the display), so this works on headless
+    machines, e.g., with ``SDL_VIDEODRIVER=dummy``. See video.py for rendering replays.
+    """
+
+    def create_window(self, screen_width: int, screen_height: int) -> pygame.surface.Surface:
+        return pygame.Surface((screen_width, screen_height))
+
+    def update(self, game: Game) -> None:
+        self.game = game
+        self.draw()
 
 
 class HeadlessGameView(GameView):